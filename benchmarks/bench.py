@@ -0,0 +1,288 @@
+# bench.py
+"""Benchmarks reproducibles de pista, dibujo, presentación, transiciones, preguntas, espectador y arranque.
+
+Se ejecutan con el driver de video "dummy" de SDL, sin abrir ventana:
+
+    python benchmarks/bench.py --out resultados.json
+    python benchmarks/bench.py --baseline resultados.json --tolerance 0.2
+
+La resolución interna y la ventana se toman de ROLLERCOSTER_RENDER y
+ROLLERCOSTER_WINDOW, así que el ahorro de dibujar a menor resolución se mide
+comparando dos corridas:
+
+    python benchmarks/bench.py --only drawing display --out 1024.json
+    ROLLERCOSTER_RENDER=512x512 python benchmarks/bench.py --only drawing display --baseline 1024.json
+
+Con --baseline se compara contra una corrida anterior y el proceso termina
+con código 1 si algún benchmark es más lento que la tolerancia indicada.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Caché de pistas, registro de partidas y reserva de preguntas generadas van a una
+# carpeta personal temporal: los benchmarks no tocan los datos del usuario
+_HOME = tempfile.mkdtemp(prefix="rollercoster-bench-")
+atexit.register(shutil.rmtree, _HOME, ignore_errors=True)
+os.environ["HOME"] = os.environ["USERPROFILE"] = _HOME
+os.environ["ROLLERCOSTER_TELEMETRY"] = "0"
+for _variable in ("ROLLERCOSTER_RECORD", "ROLLERCOSTER_SPECTATOR"):
+    os.environ.pop(_variable, None)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame
+
+NUM_POINTS = [1000, 10000, 100000]
+
+# Tamaño del banco sintético de preguntas, por nivel
+BANK_SIZE = 20000
+
+# Carritos en la vista de espectador
+SPECTATOR_CARS = [30, 300]
+
+# Script que arranca el juego y se detiene en el primer cuadro del menú
+COLD_START = """
+import os, sys, time
+t0 = time.perf_counter()
+import pygame
+def _primer_cuadro(*args):
+    print(time.perf_counter() - t0, flush=True)
+    os._exit(0)
+pygame.display.flip = _primer_cuadro
+pygame.display.update = lambda *args: None
+sys.argv = ["main.py"]
+import runpy
+runpy.run_path("main.py", run_name="__main__")
+"""
+
+
+def medir(fn, repeat, setup=None):
+    """Ejecuta `fn` `repeat` veces y retorna estadísticas en milisegundos."""
+    tiempos = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - t) * 1000)
+    return {"mean_ms": statistics.fmean(tiempos), "median_ms": statistics.median(tiempos),
+            "min_ms": min(tiempos), "runs": repeat}
+
+
+def bench_track(results, repeat):
+    import numpy as np
+    from rollercoster.config import (TRACK_POINTS, TRACK_SIMPLIFY_TOLERANCE, SCREEN_WIDTH, ANIM_HEIGHT,
+                                     TRACK_MARGIN)
+    from rollercoster.drawing import simplify_polyline
+    from rollercoster.levels import NIVELES
+    from rollercoster.track import build_track
+    # Área de dibujo de la pista en la resolución interna configurada
+    ancho = SCREEN_WIDTH - 2 * TRACK_MARGIN
+    alto = ANIM_HEIGHT - 2 * TRACK_MARGIN
+    for nivel, (_, _, valores) in enumerate(NIVELES, start=1):
+        for n in NUM_POINTS:
+            results[f"track_build/level{nivel}/n{n}"] = medir(
+                lambda: build_track(valores['func'], valores['xmin'], valores['xmax'], n), repeat)
+        for adaptive in (False, True):
+            nombre = f"track_build/level{nivel}/{'adaptive' if adaptive else 'uniform'}"
+            results[nombre] = medir(
+                lambda: build_track(valores['func'], valores['xmin'], valores['xmax'], TRACK_POINTS, adaptive),
+                repeat)
+            # Cantidad de muestras y de vértices que llegan a pygame.draw.lines
+            track = build_track(valores['func'], valores['xmin'], valores['xmax'], TRACK_POINTS, adaptive)
+            span_y = (track.max_y - track.min_y) or 1.0
+            puntos = np.column_stack(((track.xs - track.xmin) / (track.xmax - track.xmin) * ancho,
+                                      (track.ys - track.min_y) / span_y * alto))
+            results[nombre]["samples"] = len(track)
+            results[nombre]["drawn_vertices"] = len(simplify_polyline(puntos, TRACK_SIMPLIFY_TOLERANCE))
+
+
+def bench_drawing(results, repeat):
+    from rollercoster import drawing
+    from rollercoster.game import RollerCoasterGame
+    from rollercoster.levels import NIVELES
+    from rollercoster.questions import get_quiz_questions
+
+    surface = pygame.Surface((1024, 524)).convert()
+    results["gradient/cold"] = medir(lambda: drawing.draw_vertical_gradient(surface, (60, 60, 60), (20, 20, 20)),
+                                     repeat, setup=drawing._gradient_cache.clear)
+    results["gradient/cached"] = medir(lambda: drawing.draw_vertical_gradient(surface, (60, 60, 60), (20, 20, 20)),
+                                       repeat * 10)
+
+    valores = NIVELES[3][2]
+    # Preguntas del banco: sin ellas el juego pediría preguntas generadas al pool de procesos
+    game = RollerCoasterGame(valores['func'], valores['xmin'], valores['xmax'], 4,
+                             questions=get_quiz_questions(4, random.Random(0)))
+
+    def cuadro_completo():
+        game.dirty.invalidate()
+        game.draw_animation()
+        game.draw_quiz()
+
+    def cuadro_incremental():
+        game.update(1 / 60)
+        game.draw_animation()
+        game.draw_quiz()
+        game.dirty.rects = []
+        game.dirty.full = False
+
+    game.draw_animation()
+    results["frame/draw_animation"] = medir(game.draw_animation, repeat * 10, setup=game.dirty.invalidate)
+    results["frame/draw_quiz"] = medir(game.draw_quiz, repeat * 10, setup=game.dirty.invalidate)
+    results["frame/full"] = medir(cuadro_completo, repeat * 10)
+    results["frame/incremental"] = medir(cuadro_incremental, repeat * 10)
+
+
+def bench_display(results, repeat):
+    from rollercoster import display
+    # Con resolución interna distinta de la ventana incluye la pasada de escalado
+    results["display/present_full"] = medir(display.flip, repeat * 10)
+
+
+def bench_transitions(results, repeat):
+    from rollercoster import display
+    from rollercoster.transitions import fade_in, fade_out
+    screen = display.get_surface()
+    results["transition/fade_out"] = medir(lambda: fade_out(screen, speed=10), max(1, repeat // 5))
+    results["transition/fade_in"] = medir(lambda: fade_in(screen, speed=10), max(1, repeat // 5))
+
+
+def bench_questions(results, repeat):
+    from rollercoster.questions import QuestionBank
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "preguntas.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for level in range(1, 6):
+                for i in range(BANK_SIZE):
+                    f.write(json.dumps({"level": level, "topic": f"tema{i % 7}",
+                                        "question": f"¿Cuánto es {i} + {level}?",
+                                        "options": [str(i + level + d) for d in (-1, 0, 1, 2)],
+                                        "answer": str(i + level)}, ensure_ascii=False) + "\n")
+        index_dir = os.path.join(tmp, "indice")
+        results["questions/build_index"] = medir(lambda: QuestionBank(path).levels(), max(1, repeat // 5))
+        QuestionBank(path, index_dir).levels()
+        results["questions/load_index"] = medir(lambda: QuestionBank(path, index_dir).levels(), repeat)
+
+        bank = QuestionBank(path, index_dir)
+        rng = random.Random(0)
+        bank.sample(1, rng=rng)
+        # Banco sin preguntas en memoria: cada muestra lee del archivo
+        results["questions/sample_cold"] = medir(lambda: bank.sample(3, rng=rng), repeat,
+                                                 setup=bank._questions.clear)
+        results["questions/sample_topic"] = medir(lambda: bank.sample(4, rng=rng, topic="tema3"), repeat)
+
+
+def bench_spectator(results, repeat):
+    from rollercoster import display
+    from rollercoster.spectator import CarFleet, SpectatorView
+    screen = display.get_surface()
+    levels = [1, 3, 4]
+    view = SpectatorView(levels, screen)
+    rng = random.Random(0)
+    for cars in SPECTATOR_CARS:
+        fleet = CarFleet()
+        for i in range(cars):
+            fleet.update(i, rng.randrange(len(levels)), rng.random(), 0.0, f"Alumno {i}")
+        results[f"spectator/frame/cars{cars}"] = medir(lambda: view.draw(fleet, 0.5), repeat)
+
+
+def bench_cold_start(results, repeat):
+    tiempos_internos = []
+    tiempos_totales = []
+    for _ in range(max(1, repeat // 5)):
+        t = time.perf_counter()
+        salida = subprocess.run([sys.executable, "-c", COLD_START], cwd=ROOT, capture_output=True,
+                                text=True, check=True, env=os.environ.copy())
+        tiempos_totales.append((time.perf_counter() - t) * 1000)
+        tiempos_internos.append(float(salida.stdout.strip().splitlines()[-1]) * 1000)
+    results["startup/first_menu_frame"] = {"mean_ms": statistics.fmean(tiempos_internos),
+                                           "median_ms": statistics.median(tiempos_internos),
+                                           "min_ms": min(tiempos_internos), "runs": len(tiempos_internos)}
+    results["startup/process_total"] = {"mean_ms": statistics.fmean(tiempos_totales),
+                                        "median_ms": statistics.median(tiempos_totales),
+                                        "min_ms": min(tiempos_totales), "runs": len(tiempos_totales)}
+
+
+GRUPOS = {
+    "track": bench_track,
+    "drawing": bench_drawing,
+    "display": bench_display,
+    "transitions": bench_transitions,
+    "questions": bench_questions,
+    "spectator": bench_spectator,
+    "startup": bench_cold_start,
+}
+
+
+def comparar(actual, base, tolerancia):
+    """Retorna la lista de benchmarks que empeoraron más que la tolerancia."""
+    regresiones = []
+    for nombre, datos in actual.items():
+        anterior = base.get(nombre)
+        if anterior is None or anterior["median_ms"] <= 0:
+            continue
+        cambio = datos["median_ms"] / anterior["median_ms"] - 1
+        datos["baseline_median_ms"] = anterior["median_ms"]
+        datos["change"] = cambio
+        if cambio > tolerancia:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de Roller Coaster Adventure.")
+    parser.add_argument("--out", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="resultados anteriores contra los que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="empeoramiento relativo permitido respecto a la base (0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", nargs="+", choices=sorted(GRUPOS), default=sorted(GRUPOS))
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    from rollercoster import display
+    from rollercoster.config import SCREEN_WIDTH, SCREEN_HEIGHT, WINDOW_SIZE
+    pygame.init()
+    display.set_mode()
+
+    results = {}
+    for grupo in args.only:
+        GRUPOS[grupo](results, args.repeat)
+
+    regresiones = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regresiones = comparar(results, json.load(f)["results"], args.tolerance)
+
+    salida = {
+        "meta": {"python": platform.python_version(), "pygame": pygame.version.ver,
+                 "platform": platform.platform(), "repeat": args.repeat,
+                 "render": [SCREEN_WIDTH, SCREEN_HEIGHT], "window": list(WINDOW_SIZE)},
+        "results": results,
+        "regressions": regresiones,
+    }
+    texto = json.dumps(salida, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(texto)
+    print(texto)
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 # main.py
+from rollercoster import startup
 from rollercoster.menu import menu
 
 if __name__ == '__main__':
@@ -0,0 +1,46 @@
+# assets.py
+import os
+import pygame
+
+from rollercoster.config import IMAGE_DIR, UI_SCALE, SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Imágenes ya cargadas, escaladas a la resolución interna y convertidas al
+# formato de la pantalla; la clave incluye la resolución para la que se escalaron
+_images = {}
+_sprites = {}
+
+
+def load_image(name, alpha=True):
+    """Carga una imagen de la carpeta de imágenes una sola vez.
+
+    La imagen se convierte al formato de la pantalla (convert_alpha si tiene
+    transparencia) para que los blits no paguen la conversión de píxeles, y
+    se escala una sola vez a la resolución interna (las imágenes están hechas
+    para la resolución de diseño). Debe llamarse después de display.set_mode.
+    """
+    key = (name, alpha, (SCREEN_WIDTH, SCREEN_HEIGHT))
+    image = _images.get(key)
+    if image is None:
+        image = pygame.image.load(os.path.join(IMAGE_DIR, name))
+        if UI_SCALE != 1:
+            size = (max(1, round(image.get_width() * UI_SCALE)), max(1, round(image.get_height() * UI_SCALE)))
+            image = pygame.transform.smoothscale(image.convert_alpha(), size)
+        image = image.convert_alpha() if alpha else image.convert()
+        _images[key] = image
+    return image
+
+
+def load_sprite(name):
+    """Recorta la zona visible de una capa transparente de pantalla completa.
+
+    Retorna (superficie, rect): la superficie recortada y el rectángulo que
+    ocupaba dentro de la imagen original, para dibujarla en la misma posición.
+    """
+    sprite = _sprites.get(name)
+    if sprite is None:
+        image = load_image(name)
+        bounds = image.get_bounding_rect()
+        sprite = (image.subsurface(bounds).copy(), bounds)
+        _sprites[name] = sprite
+    return sprite
+
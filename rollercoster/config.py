@@ -1,13 +1,105 @@
 # config.py
-import pygame
+import os
+
+# Resolución de diseño: las coordenadas fijas de la interfaz (botones, textos,
+# márgenes) y las imágenes de la carpeta imagen están pensadas para este tamaño
+DESIGN_WIDTH = 1024
+DESIGN_HEIGHT = 1024
+
+
+def _tamano(variable, por_defecto):
+    """Lee un tamaño "ANCHOxALTO" (o un solo número para un cuadrado) del entorno."""
+    valor = os.environ.get(variable)
+    if not valor:
+        return por_defecto
+    ancho, _, alto = valor.lower().partition("x")
+    return int(ancho), int(alto or ancho)
+
+
+# Resolución interna en la que se dibuja todo (ROLLERCOSTER_RENDER=512x512) y
+# tamaño de la ventana (ROLLERCOSTER_WINDOW); si difieren, cada cuadro se
+# escala a la ventana en una sola pasada al presentarlo
+SCREEN_WIDTH, SCREEN_HEIGHT = _tamano("ROLLERCOSTER_RENDER", (DESIGN_WIDTH, DESIGN_HEIGHT))
+WINDOW_SIZE = _tamano("ROLLERCOSTER_WINDOW", (DESIGN_WIDTH, DESIGN_HEIGHT))
+# Escalado suave (más lento) en lugar de vecino más cercano en esa pasada
+RENDER_SMOOTH = os.environ.get("ROLLERCOSTER_RENDER_SMOOTH", "0") == "1"
+
+# Factor de la resolución interna respecto de la de diseño
+UI_SCALE = min(SCREEN_WIDTH / DESIGN_WIDTH, SCREEN_HEIGHT / DESIGN_HEIGHT)
+
+
+def px(valor):
+    """Convierte una medida en píxeles de diseño a píxeles de la resolución interna."""
+    return int(round(valor * UI_SCALE))
 
-# Dimensiones de la pantalla
-SCREEN_WIDTH = 1024
-SCREEN_HEIGHT = 1024
 
 # Áreas de la pantalla
-ANIM_HEIGHT = 500
+ANIM_HEIGHT = px(500)
 QUIZ_HEIGHT = SCREEN_HEIGHT - ANIM_HEIGHT
+TRACK_MARGIN = px(40)
+TRACK_POINTS = 10000
+# Muestreo adaptativo por curvatura (TRACK_POINTS pasa a ser el máximo de muestras)
+TRACK_ADAPTIVE = True
+# Tolerancia en píxeles (de la resolución interna) al simplificar la polilínea que se dibuja
+TRACK_SIMPLIFY_TOLERANCE = 0.5
+
+# Fracción de la pista recorrida por segundo con velocidad 1.0
+CAR_SPEED = 0.05
+
+# Actualizar solo las zonas modificadas en lugar de toda la ventana
+DIRTY_RECTS = True
+
+# Límite de cuadros por segundo y espera máxima en reposo para menú y niveles
+MENU_FPS = 30
+IDLE_TIMEOUT_MS = 500
+
+# Perfilado de cuadros: ROLLERCOSTER_PROFILE=traza.json (o .csv) lo activa
+PROFILE_PATH = os.environ.get("ROLLERCOSTER_PROFILE") or None
+PROFILE_FRAMES = 600
+
+# Grabación de partidas para reproducirlas: ROLLERCOSTER_RECORD=carpeta la activa
+RECORD_DIR = os.environ.get("ROLLERCOSTER_RECORD") or None
+
+# Carpetas de imágenes y de datos del juego
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGE_DIR = os.path.join(BASE_DIR, "imagen")
+DATA_DIR = os.path.join(BASE_DIR, "datos")
+
+# Banco de preguntas (JSON Lines) y preguntas por partida
+QUESTIONS_PATH = os.path.join(DATA_DIR, "preguntas.jsonl")
+QUESTIONS_PER_GAME = 5
+
+# Preguntas generadas con SymPy: cuántas entran en cada partida, tamaño del lote
+# que se pide al pool y segundos tras los que un lote pendiente se da por perdido
+GENERATED_PER_GAME = 2
+GENERATED_BATCH = 10
+GENERATED_TIMEOUT = 30
+
+# Caché de pistas compiladas
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".rollercoster")
+TRACK_CACHE_SIZE = 16
+
+# Registro de partidas: ROLLERCOSTER_TELEMETRY=0 lo desactiva. Se escribe cada
+# TELEMETRY_FLUSH_INTERVAL segundos o al juntar TELEMETRY_FLUSH_RECORDS registros,
+# y al superar TELEMETRY_MAX_BYTES se conservan solo las últimas partidas
+TELEMETRY_ENABLED = os.environ.get("ROLLERCOSTER_TELEMETRY", "1") != "0"
+TELEMETRY_DIR = os.path.join(CACHE_DIR, "telemetry")
+TELEMETRY_FLUSH_INTERVAL = 2.0
+TELEMETRY_FLUSH_RECORDS = 64
+TELEMETRY_MAX_BYTES = 256 * 1024
+TELEMETRY_KEEP_SESSIONS = 200
+
+# Vista de espectador: ROLLERCOSTER_SPECTATOR=host:puerto hace que cada partida
+# envíe su avance cada SPECTATOR_INTERVAL segundos; los carritos sin datos
+# durante SPECTATOR_STALE segundos desaparecen de la vista
+SPECTATOR_ADDRESS = os.environ.get("ROLLERCOSTER_SPECTATOR") or None
+SPECTATOR_PORT = 5005
+SPECTATOR_INTERVAL = 0.25
+SPECTATOR_STALE = 30
+
+# Procesos que compilan pistas y tiempo máximo de espera por una pista (segundos)
+TRACK_WORKERS = 1
+TRACK_TIMEOUT = 5
 
 # Colores (RGB)
 COLOR_BG = (20, 20, 20)
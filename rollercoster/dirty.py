@@ -0,0 +1,38 @@
+# dirty.py
+import pygame
+
+from rollercoster import display
+from rollercoster.config import DIRTY_RECTS
+
+
+class DirtyRects:
+    """Acumula las zonas de la pantalla que cambiaron en el cuadro actual.
+
+    present() actualiza solo esas zonas con display.update(rects); tras
+    una transición de escena se llama a invalidate() para forzar un flip completo.
+    """
+
+    def __init__(self, enabled=DIRTY_RECTS, display=True):
+        self.enabled = enabled
+        # False al dibujar en una superficie fuera de pantalla: no hay ventana que actualizar
+        self.display = display
+        self.rects = []
+        self.full = True
+
+    def add(self, rect):
+        if rect is not None and rect.width > 0 and rect.height > 0:
+            self.rects.append(pygame.Rect(rect))
+
+    def invalidate(self):
+        """Marca toda la pantalla para redibujar en el próximo cuadro."""
+        self.full = True
+
+    def present(self):
+        if not self.display:
+            pass
+        elif self.full or not self.enabled:
+            display.flip()
+        elif self.rects:
+            display.update(self.rects)
+        self.rects = []
+        self.full = False
@@ -0,0 +1,98 @@
+# display.py
+"""Ventana del juego con resolución interna independiente.
+
+Las pantallas dibujan en la superficie que retorna set_mode()/get_surface(),
+de SCREEN_WIDTH x SCREEN_HEIGHT. Si la ventana (WINDOW_SIZE) tiene otro
+tamaño, esa superficie es una superficie aparte y flip()/update() la escalan a
+la ventana en una sola pasada por cuadro; las posiciones del mouse se llevan a
+la resolución interna con la transformación inversa (to_render, mouse_pos,
+map_events). Si los tamaños coinciden se dibuja directo en la ventana.
+"""
+import pygame
+
+from rollercoster.config import SCREEN_WIDTH, SCREEN_HEIGHT, WINDOW_SIZE, RENDER_SMOOTH, px
+
+RENDER_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)
+
+# Ventana creada por set_mode y superficie interna asociada (la misma si no se escala)
+_window = None
+_render = None
+
+
+def set_mode():
+    """Crea la ventana (o reutiliza la actual) y retorna la superficie de dibujo."""
+    global _window, _render
+    window = pygame.display.get_surface()
+    if window is None or window.get_size() != WINDOW_SIZE:
+        window = pygame.display.set_mode(WINDOW_SIZE)
+    if window is not _window:
+        _window = window
+        _render = window if WINDOW_SIZE == RENDER_SIZE else pygame.Surface(RENDER_SIZE).convert()
+    return _render
+
+
+def get_surface():
+    """Superficie de dibujo de la ventana actual, o None si no hay ventana."""
+    window = pygame.display.get_surface()
+    if window is not None and window is _window:
+        return _render
+    return window
+
+
+def scaled():
+    """True si la resolución interna se escala a una ventana de otro tamaño."""
+    return _render is not None and _render is not _window and pygame.display.get_surface() is _window
+
+
+def _escalar():
+    if RENDER_SMOOTH:
+        pygame.transform.smoothscale(_render, _window.get_size(), _window)
+    else:
+        pygame.transform.scale(_render, _window.get_size(), _window)
+
+
+def flip():
+    """Presenta el cuadro completo."""
+    if scaled():
+        _escalar()
+    pygame.display.flip()
+
+
+def update(rects):
+    """Presenta solo las zonas `rects` (en coordenadas de la resolución interna)."""
+    if not scaled():
+        pygame.display.update(rects)
+        return
+    _escalar()
+    sx = _window.get_width() / SCREEN_WIDTH
+    sy = _window.get_height() / SCREEN_HEIGHT
+    # Se redondea hacia afuera para no dejar bordes sin actualizar
+    pygame.display.update([pygame.Rect(int(r.x * sx), int(r.y * sy), int(r.w * sx) + 2, int(r.h * sy) + 2)
+                           for r in map(pygame.Rect, rects)])
+
+
+def to_render(pos):
+    """Lleva una posición de la ventana a la resolución interna."""
+    if not scaled():
+        return pos
+    return (int(pos[0] * SCREEN_WIDTH / _window.get_width()),
+            int(pos[1] * SCREEN_HEIGHT / _window.get_height()))
+
+
+def mouse_pos():
+    """Posición del mouse en la resolución interna."""
+    return to_render(pygame.mouse.get_pos())
+
+
+def map_events(events):
+    """Retorna los eventos con las posiciones del mouse en la resolución interna."""
+    if not scaled():
+        return events
+    return [pygame.event.Event(e.type, dict(e.dict, pos=to_render(e.pos))) if hasattr(e, "pos") else e
+            for e in events]
+
+
+def scale_rect(rect):
+    """Rectángulo en píxeles de diseño llevado a la resolución interna."""
+    x, y, w, h = pygame.Rect(rect)
+    return pygame.Rect(px(x), px(y), px(w), px(h))
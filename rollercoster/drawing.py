@@ -1,14 +1,73 @@
 # drawing.py
+from collections import OrderedDict
+
+import numpy as np
 import pygame
 
+GRADIENT_CACHE_SIZE = 16
+
+# Degradados ya generados, indexados por (tamaño, color superior, color inferior)
+_gradient_cache = OrderedDict()
+
+def get_vertical_gradient(size, top_color, bottom_color):
+    """Retorna una superficie con el degradado vertical, generándola una sola vez."""
+    key = (tuple(size), tuple(top_color[:3]), tuple(bottom_color[:3]))
+    gradient = _gradient_cache.get(key)
+    if gradient is not None:
+        _gradient_cache.move_to_end(key)
+        return gradient
+
+    width, height = key[0]
+    ratio = (np.arange(height) / height)[:, np.newaxis]
+    colors = np.array(key[1], dtype=float) * (1 - ratio) + np.array(key[2], dtype=float) * ratio
+    # Franja de 1 píxel de ancho escalada al ancho final
+    strip = pygame.surfarray.make_surface(colors.astype(np.uint8)[np.newaxis, :, :])
+    gradient = pygame.transform.scale(strip, (width, height))
+    if pygame.display.get_surface() is not None:
+        gradient = gradient.convert()
+
+    _gradient_cache[key] = gradient
+    while len(_gradient_cache) > GRADIENT_CACHE_SIZE:
+        _gradient_cache.popitem(last=False)
+    return gradient
+
+def simplify_polyline(points, tolerance=0.5):
+    """Simplifica una polilínea con Douglas-Peucker.
+
+    `points` es un arreglo (N, 2) en coordenadas de pantalla; se descartan los
+    vértices que están a menos de `tolerance` píxeles del segmento que los une.
+    Retorna un arreglo con los vértices conservados, en orden.
+    """
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    if n < 3:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        a = points[first]
+        d = points[last] - a
+        inner = points[first + 1:last] - a
+        norm = np.hypot(d[0], d[1])
+        if norm == 0:
+            dist = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            dist = np.abs(inner[:, 0] * d[1] - inner[:, 1] * d[0]) / norm
+        index = int(np.argmax(dist))
+        if dist[index] > tolerance:
+            split = first + 1 + index
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return points[keep]
+
 def draw_vertical_gradient(surface, top_color, bottom_color):
     """Dibuja un degradado vertical en la superficie dada."""
-    height = surface.get_height()
-    width = surface.get_width()
-    for y in range(height):
-        ratio = y / height
-        color = [int(top_color[i]*(1 - ratio) + bottom_color[i]*ratio) for i in range(3)]
-        pygame.draw.line(surface, color, (0, y), (width, y))
+    surface.blit(get_vertical_gradient(surface.get_size(), top_color, bottom_color), (0, 0))
 
 def draw_epic_menu_background(surface, stars):
     """Dibuja el fondo épico para el menú con un degradado y estrellas."""
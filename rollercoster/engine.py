@@ -0,0 +1,136 @@
+# engine.py
+import random
+import time
+
+from rollercoster.config import CAR_SPEED
+from rollercoster.questions import get_quiz_questions
+
+# Reglas de la partida
+SPEED_INICIAL = 0.5
+SPEED_MIN = 0.5
+SPEED_MAX = 5.0
+SPEED_PASO = 0.5
+TIEMPO_POR_PREGUNTA = 5
+MAX_SIN_RESPONDER = 2
+MIN_CORRECTAS_EXITO = 3
+
+
+class SimClock:
+    """Reloj manual: el tiempo solo avanza cuando la simulación (o el bucle del juego) lo pide."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, dt):
+        self.now += dt
+
+
+class GameState:
+    """Estado y reglas de una partida, sin depender de la pantalla.
+
+    `clock` es la función que da la hora actual en segundos (time.time por
+    defecto) y `rng` el generador usado para elegir las preguntas; ambos se
+    pueden inyectar para simular partidas sin ventana.
+    """
+
+    def __init__(self, level, questions=None, clock=time.time, rng=None):
+        self.level = level
+        self.clock = clock
+        self.rng = rng if rng is not None else random.Random()
+
+        self.progress = 0.0
+        self.speed_factor = SPEED_INICIAL
+        self.unanswered_count = 0
+        self.quiz_correct = 0
+        self.question_time_limit = TIEMPO_POR_PREGUNTA
+        self.question_start_time = clock()
+        self.current_question_index = 0
+        self.quiz_questions = questions if questions is not None else get_quiz_questions(level, self.rng)
+        self.feedback_message = ""
+        self.game_start_time = clock()
+        self.game_over = False
+        self.completed = False
+        self.finish_time = None
+
+    def current_question(self):
+        """Pregunta en curso, o None si ya se respondieron todas."""
+        if self.current_question_index < len(self.quiz_questions):
+            return self.quiz_questions[self.current_question_index]
+        return None
+
+    def remaining_time(self):
+        return max(0, int(self.question_time_limit - (self.clock() - self.question_start_time)))
+
+    def elapsed(self):
+        if self.finish_time is not None:
+            return self.finish_time
+        return self.clock() - self.game_start_time
+
+    def process_timeout(self):
+        """Procesa el evento cuando se agota el tiempo de respuesta."""
+        self.feedback_message = "Tiempo agotado. Velocidad reducida."
+        self.speed_factor = max(SPEED_MIN, self.speed_factor - SPEED_PASO)
+        self.unanswered_count += 1
+        self.current_question_index += 1
+        self.question_start_time = self.clock()
+
+    def process_answer(self, selected_option):
+        """Procesa la respuesta seleccionada y retorna si fue correcta."""
+        q = self.quiz_questions[self.current_question_index]
+        correct = selected_option == q["answer"]
+        if correct:
+            self.feedback_message = "¡Correcto! Velocidad aumentada."
+            self.quiz_correct += 1
+            self.speed_factor = min(SPEED_MAX, self.speed_factor + SPEED_PASO)
+        else:
+            self.feedback_message = f"Incorrecto. La respuesta es: {q['answer']}. Velocidad reducida."
+            self.speed_factor = max(SPEED_MIN, self.speed_factor - SPEED_PASO)
+        self.current_question_index += 1
+        self.question_start_time = self.clock()
+        return correct
+
+    def update(self, dt):
+        """Avanza el carrito y verifica el temporizador del quiz.
+
+        Retorna True si en este paso se agotó el tiempo de una pregunta.
+        """
+        if self.game_over:
+            return False
+        timed_out = False
+        self.progress += self.speed_factor * dt * CAR_SPEED
+        if self.progress >= 1.0:
+            self.progress = 1.0
+            self.completed = True
+            self._finish()
+        if self.current_question_index < len(self.quiz_questions):
+            elapsed = self.clock() - self.question_start_time
+            if elapsed >= self.question_time_limit:
+                self.process_timeout()
+                timed_out = True
+        if self.unanswered_count >= MAX_SIN_RESPONDER:
+            self._finish()
+        return timed_out
+
+    def _finish(self):
+        if not self.game_over:
+            self.game_over = True
+            self.finish_time = self.clock() - self.game_start_time
+
+    @property
+    def success(self):
+        return self.quiz_correct >= MIN_CORRECTAS_EXITO
+
+    def result(self):
+        """Resumen de la partida terminada."""
+        return {
+            "level": self.level,
+            "completed": self.completed,
+            "success": self.success,
+            "correct": self.quiz_correct,
+            "unanswered": self.unanswered_count,
+            "questions": len(self.quiz_questions),
+            "time": self.elapsed(),
+        }
@@ -0,0 +1,199 @@
+# expressions.py
+"""Interpretación segura y acotada de las funciones que definen una pista.
+
+Las funciones de los niveles creados por los estudiantes llegan como texto
+libre, así que antes de evaluarlas se valida que solo usen `x`, números y
+funciones conocidas, y que no superen ciertos límites de tamaño; las
+muestras resultantes se limpian de valores no finitos o desmedidos.
+"""
+import io
+import re
+import time
+import tokenize
+
+import numpy as np
+
+# Límites de complejidad de la expresión
+MAX_EXPR_LENGTH = 200
+MAX_OPS = 60
+MAX_DEPTH = 25
+MAX_EXPONENT = 50
+# Valor absoluto máximo de los números y de las potencias sin x (como 2**40)
+MAX_LITERAL = 1e100
+
+# Tiempo máximo (segundos) para la evaluación punto a punto cuando no hay versión
+# vectorizada; build_track lo aplica a toda la construcción de una pista
+EVAL_TIME_LIMIT = 1.0
+
+# Las muestras con valor absoluto mayor a MAX_VALUE cuentan como desbordadas; si
+# lo están más de OVERFLOW_FRACTION de ellas la función no se puede dibujar
+MAX_VALUE = 1e12
+OVERFLOW_FRACTION = 0.1
+
+# Margen, en múltiplos del rango entre percentiles 1 y 99, fuera del cual se recorta la pista
+CLIP_PAD = 1.0
+
+FUNCIONES_PERMITIDAS = {
+    "sin", "cos", "tan", "asin", "acos", "atan", "sinh", "cosh", "tanh",
+    "exp", "log", "ln", "sqrt", "abs", "Abs",
+}
+CONSTANTES_PERMITIDAS = {"x", "pi", "e", "E"}
+
+_CARACTERES = re.compile(r"^[0-9a-zA-Z_+\-*/^().,\s]*$")
+
+
+class ExpressionError(ValueError):
+    """La expresión no es válida o supera los límites permitidos."""
+
+
+def _local_dict(sp):
+    nombres = {nombre: getattr(sp, nombre) for nombre in FUNCIONES_PERMITIDAS if hasattr(sp, nombre)}
+    nombres.update({"ln": sp.log, "abs": sp.Abs, "x": sp.Symbol("x"), "pi": sp.pi, "e": sp.E, "E": sp.E})
+    return nombres
+
+
+def _depth(expr):
+    if not expr.args:
+        return 1
+    return 1 + max(_depth(arg) for arg in expr.args)
+
+
+def parse_expression(func_str):
+    """Convierte el texto en una expresión de SymPy respetando la lista blanca y los límites.
+
+    Lanza ExpressionError si el texto usa nombres o caracteres no permitidos,
+    es demasiado largo o complejo, o contiene exponentes desmedidos.
+    """
+    import sympy as sp
+    from sympy.parsing.sympy_parser import parse_expr, standard_transformations, convert_xor
+
+    if not isinstance(func_str, str) or not func_str.strip():
+        raise ExpressionError("La función está vacía.")
+    if len(func_str) > MAX_EXPR_LENGTH:
+        raise ExpressionError(f"La función supera los {MAX_EXPR_LENGTH} caracteres.")
+    if not _CARACTERES.match(func_str) or "__" in func_str:
+        raise ExpressionError("La función contiene caracteres no permitidos.")
+    _check_tokens(func_str)
+
+    transformaciones = standard_transformations + (convert_xor,)
+    # Primero sin evaluar: una potencia como 9**9**9 se rechaza antes de calcularla
+    try:
+        expr = parse_expr(func_str, local_dict=_local_dict(sp), transformations=transformaciones, evaluate=False)
+    except Exception as e:
+        raise ExpressionError(f"No se pudo interpretar la función: {e}") from e
+    _check_limits(sp, expr)
+    try:
+        expr = parse_expr(func_str, local_dict=_local_dict(sp), transformations=transformaciones)
+    except Exception as e:
+        raise ExpressionError(f"No se pudo interpretar la función: {e}") from e
+    _check_limits(sp, expr)
+    return expr
+
+
+def _check_tokens(func_str):
+    """Revisa cada nombre contra la lista blanca y rechaza el acceso a atributos.
+
+    Se tokeniza en lugar de buscar nombres con una expresión regular: así el
+    punto de un número (1.5) y el exponente de la notación científica (1e3)
+    quedan dentro del número, y cualquier otro "." es un atributo (pi.n(...)).
+    """
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(func_str).readline))
+    except (tokenize.TokenError, SyntaxError) as e:
+        raise ExpressionError(f"No se pudo interpretar la función: {e}") from e
+    for token in tokens:
+        if token.type == tokenize.NAME:
+            if token.string not in FUNCIONES_PERMITIDAS and token.string not in CONSTANTES_PERMITIDAS:
+                raise ExpressionError(f"Nombre no permitido: {token.string}")
+        elif token.type == tokenize.OP and token.string == ".":
+            raise ExpressionError("La función no puede acceder a atributos.")
+
+
+def _check_limits(sp, expr):
+    if not isinstance(expr, sp.Expr):
+        raise ExpressionError("La función no es una expresión numérica.")
+    if not expr.free_symbols <= {sp.Symbol("x")}:
+        raise ExpressionError("La función solo puede depender de x.")
+    if sp.count_ops(expr) > MAX_OPS:
+        raise ExpressionError("La función es demasiado compleja.")
+    if _depth(expr) > MAX_DEPTH:
+        raise ExpressionError("La función está demasiado anidada.")
+    for numero in expr.atoms(sp.Number):
+        if numero.is_finite and abs(float(numero)) > MAX_LITERAL:
+            raise ExpressionError("La función tiene números demasiado grandes.")
+    # De adentro hacia afuera: cada potencia se evalúa solo si las que contiene ya están acotadas
+    for sub in sp.postorder_traversal(expr):
+        if not isinstance(sub, sp.Pow):
+            continue
+        if sub.exp.is_number and abs(complex(sub.exp)) > MAX_EXPONENT:
+            raise ExpressionError("La función tiene exponentes demasiado grandes.")
+        if sub.is_number and _desmedido(sub):
+            raise ExpressionError("La función tiene números demasiado grandes.")
+
+
+def _desmedido(numero):
+    # evalf no construye el entero exacto, así que es barato aunque el valor sea enorme
+    try:
+        return not abs(complex(numero.evalf(15))) <= MAX_LITERAL
+    except (OverflowError, TypeError):
+        return True
+
+
+def evaluate_pointwise(f_sym, x, xs, deadline=None):
+    """Evalúa la expresión punto a punto con subs, cortando al llegar a `deadline`.
+
+    `deadline` es un instante de time.perf_counter() compartido por todas las
+    evaluaciones de una misma pista; sin él, el límite es EVAL_TIME_LIMIT desde ahora.
+    """
+    limit = deadline if deadline is not None else time.perf_counter() + EVAL_TIME_LIMIT
+    ys = np.empty(len(xs), dtype=float)
+    for i, val in enumerate(xs):
+        if time.perf_counter() > limit:
+            raise ExpressionError("La evaluación de la función tardó demasiado.")
+        try:
+            ys[i] = float(f_sym.subs(x, val))
+        except (TypeError, ValueError):
+            ys[i] = np.nan
+    return ys
+
+
+def sanitize_samples(xs, ys, reference=None):
+    """Reemplaza muestras no finitas y recorta valores desmedidos.
+
+    Las muestras no finitas se interpolan a partir de sus vecinas y los valores
+    muy alejados del rango típico de la función (por ejemplo cerca de una
+    asíntota) se recortan. Ese rango y la proporción de desbordes se miden en
+    `reference`, valores de la función equiespaciados en x, si las muestras no
+    lo están (el muestreo adaptativo las concentra cerca de las asíntotas).
+    Retorna (ys_limpio, informe) o lanza ExpressionError si no queda ninguna
+    muestra utilizable o la función crece sin medida en buena parte del rango.
+    """
+    ys = np.array(ys, dtype=float)
+    desbordados = np.abs(ys) > MAX_VALUE
+    if reference is None:
+        proporcion = np.count_nonzero(desbordados) / len(ys)
+    else:
+        reference = np.asarray(reference, dtype=float)
+        proporcion = np.count_nonzero(np.abs(reference) > MAX_VALUE) / len(reference)
+    if proporcion > OVERFLOW_FRACTION:
+        raise ExpressionError("La función toma valores demasiado grandes en el rango elegido.")
+    ys[desbordados] = np.nan
+    finitos = np.isfinite(ys)
+    no_finitos = int(len(ys) - np.count_nonzero(finitos))
+    if not finitos.any():
+        raise ExpressionError("La función no tiene valores reales en el rango elegido.")
+    if no_finitos:
+        ys[~finitos] = np.interp(xs[~finitos], xs[finitos], ys[finitos])
+
+    tipicos = ys
+    if reference is not None:
+        tipicos = reference[np.isfinite(reference) & (np.abs(reference) <= MAX_VALUE)]
+        if not tipicos.size:
+            tipicos = ys
+    q_bajo, q_alto = np.percentile(tipicos, [1, 99])
+    margen = (q_alto - q_bajo) * CLIP_PAD
+    bajo, alto = q_bajo - margen, q_alto + margen
+    recortados = int(np.count_nonzero((ys < bajo) | (ys > alto)))
+    if recortados:
+        np.clip(ys, bajo, alto, out=ys)
+    return ys, {"nonfinite": no_finitos, "clipped": recortados}
@@ -1,31 +1,45 @@
 # game.py
-import sys
-import time
 import random
+import sys
 import numpy as np
-import sympy as sp
 import pygame
-import pygame_menu
 
-from rollercoster.config import SCREEN_WIDTH, SCREEN_HEIGHT, ANIM_HEIGHT, QUIZ_HEIGHT,     COLOR_BG, COLOR_TRACK, COLOR_CAR, COLOR_OPTION_BG, COLOR_OPTION_HOVER, COLOR_TEXT,     COLOR_TIMER, COLOR_FEEDBACK, COLOR_MODAL_BG, COLOR_MODAL_BORDER
-from rollercoster.transitions import fade_in, fade_out
-from rollercoster.drawing import draw_vertical_gradient
+from rollercoster.config import SCREEN_WIDTH, SCREEN_HEIGHT, ANIM_HEIGHT, QUIZ_HEIGHT, TRACK_MARGIN, TRACK_POINTS, TRACK_SIMPLIFY_TOLERANCE,     COLOR_TRACK, COLOR_CAR, COLOR_OPTION_BG, COLOR_OPTION_HOVER, COLOR_TEXT,     COLOR_TIMER, COLOR_FEEDBACK, COLOR_MODAL_BORDER, px
+from rollercoster.transitions import Fade, darken
+from rollercoster.drawing import draw_vertical_gradient, simplify_polyline
+from rollercoster.track_cache import get_track
+from rollercoster.text_cache import text_cache, TextLabel, get_font
+from rollercoster.dirty import DirtyRects
+from rollercoster.engine import GameState, SimClock
+from rollercoster.replay import input_for_game
+from rollercoster.generator import quiz_questions
+from rollercoster.profiler import get_profiler
+from rollercoster import display, telemetry
+from rollercoster.spectator import publisher_for_game
 
-nivel = 0
+# Segundos que se muestran los resultados finales
+MODAL_DURATION = 4
 
 class RollerCoasterGame:
-    def __init__(self, func_str, xmin, xmax, level):
-        global nivel
-        nivel = level
-        # Usamos la misma pantalla definida en el menú
-        self.screen = pygame.display.get_surface()
+    def __init__(self, func_str, xmin, xmax, level, track=None, questions=None, input_source=None, screen=None):
+        # Usamos la misma pantalla definida en el menú, o una superficie fuera de pantalla
+        self.offscreen = screen is not None
+        self.screen = screen if screen is not None else display.get_surface()
         pygame.display.set_caption("Roller Coaster Adventure: Quiz del Mundo")
         self.clock = pygame.time.Clock()
 
-        # Fuentes
-        self.font = pygame.font.SysFont("Arial", 28)
-        self.small_font = pygame.font.SysFont("Arial", 20)
-        self.large_font = pygame.font.SysFont("Arial", 36)
+        # Fuentes (tamaños en píxeles de diseño, como el resto de las medidas de la pantalla)
+        self.font = get_font("Arial", px(28))
+        self.small_font = get_font("Arial", px(20))
+        self.large_font = get_font("Arial", px(36))
+
+        # Textos del HUD: se vuelven a renderizar solo cuando cambia su valor
+        self.text_cache = text_cache
+        self.score_label = TextLabel(self.small_font, "Respuestas correctas: {}", COLOR_TEXT, text_cache)
+        self.timer_label = TextLabel(self.small_font, "Tiempo: {} seg", COLOR_TIMER, text_cache)
+        self.speed_label = TextLabel(self.small_font, "Velocidad: {:.1f}", COLOR_TEXT, text_cache)
+        self.progress_label = TextLabel(self.small_font, "Pregunta {} de {}", COLOR_TEXT, text_cache)
+        self.feedback_label = TextLabel(self.small_font, "{}", COLOR_FEEDBACK, text_cache)
 
         # Áreas de la pantalla
         self.anim_rect = pygame.Rect(0, 0, SCREEN_WIDTH, ANIM_HEIGHT)
@@ -35,35 +49,60 @@ class RollerCoasterGame:
         self.func_str = func_str
         self.xmin = xmin
         self.xmax = xmax
-        x = sp.symbols('x')
-        try:
-            f_sym = sp.sympify(func_str)
-        except Exception as e:
-            f_sym = sp.sympify("10 - x**2")
-        self.f_sym = f_sym
-        self.f = lambda val: float(f_sym.subs(x, val))
-        self.num_points = 1000
-        xs = np.linspace(self.xmin, self.xmax, self.num_points)
-        self.track_points = [(x_val, self.f(x_val)) for x_val in xs]
-        self.min_y = min(pt[1] for pt in self.track_points)
-        self.max_y = max(pt[1] for pt in self.track_points)
-
-        # Variables del juego
-        self.car_index = 0.0
-        self.speed_factor = 0.5
-        self.unanswered_count = 0
-        self.quiz_correct = 0
-        self.question_time_limit = 5
-        self.question_start_time = time.time()
-        self.current_question_index = 0
-        self.quiz_questions = self.get_quiz_questions()
-        self.feedback_message = ""
-        self.game_start_time = time.time()
-        self.game_over = False
+        self.num_points = TRACK_POINTS
+        # La pista puede llegar ya preparada por el pool de procesos
+        if track is None:
+            track = get_track(func_str, self.xmin, self.xmax, self.num_points)
+        self.track = track
+        self.track_points = self.track.points
+        self.min_y = self.track.min_y
+        self.max_y = self.track.max_y
+
+        # Estado y reglas de la partida (independientes de la pantalla). El reloj
+        # de la partida avanza con la duración de cada cuadro, así una partida
+        # grabada se puede reproducir pasando por los mismos estados
+        self.level = level
+        self.game_clock = SimClock()
+        seed = random.getrandbits(32)
+        rng = random.Random(seed)
+        if questions is None:
+            # Las preguntas generadas se toman de la reserva sin esperar a SymPy
+            questions = quiz_questions(level, rng)
+        self.state = GameState(level, questions=questions, clock=self.game_clock, rng=rng)
+
+        # Entrada real, grabada o reproducida
+        if input_source is None:
+            input_source = input_for_game({"level": level, "func": func_str, "xmin": xmin, "xmax": xmax,
+                                           "seed": seed, "questions": self.state.quiz_questions})
+        self.input = input_source
+        self.mouse_pos = (0, 0)
 
         self.option_rects = []
         self.transition_alpha = 0
 
+        # Capas estáticas pre-renderizadas (se invalidan si cambia la pista o la ventana)
+        self._anim_layer = None
+        self._quiz_layer = None
+        self._layers_key = None
+        self._transition_surface = None
+        self.vertex_report = None
+
+        # Zonas modificadas en cada cuadro (actualización por rectángulos sucios)
+        self.dirty = DirtyRects(display=not self.offscreen)
+        self._anim_dirty = []
+        self._quiz_state = None
+
+        # Fundido en curso (entrada al juego o salida al terminar)
+        self.fade = None
+
+        # Perfilado opcional de las fases del cuadro
+        self.profiler = get_profiler("juego")
+
+        # Registro de respuestas, latencias y resultado de la partida
+        self.session = telemetry.start_session(level, enabled=not self.input.replaying)
+        # Avance enviado a la vista de espectador de la clase, si hay una configurada
+        self.publisher = None if self.input.replaying else publisher_for_game(level)
+
 
     def show_story(self):
         """Muestra la pantalla introductoria con la historia del juego."""
@@ -84,8 +123,8 @@ class RollerCoasterGame:
             text_surf = self.large_font.render(line, True, COLOR_TEXT)
             x = (SCREEN_WIDTH - text_surf.get_width()) // 2
             self.screen.blit(text_surf, (x, y))
-            y += 50
-        pygame.display.flip()
+            y += px(50)
+        display.flip()
         waiting = True
         while waiting:
             for event in pygame.event.get():
@@ -95,213 +134,236 @@ class RollerCoasterGame:
                     pygame.quit()
                     sys.exit()
             self.clock.tick(15)
-        fade_in(self.screen, speed=10)
+        # El juego aparece desde negro mientras ya corre el bucle principal
+        self.fade = Fade("in")
 
     def world_to_screen(self, x, y):
         """Convierte coordenadas 'mundo' a la zona de animación."""
-        margin = 40
+        margin = TRACK_MARGIN
+        # Una pista constante no tiene rango en y: se dibuja sobre el borde inferior
+        span_y = (self.max_y - self.min_y) or 1.0
         screen_x = margin + (x - self.xmin) / (self.xmax - self.xmin) * (SCREEN_WIDTH - 2 * margin)
-        screen_y = ANIM_HEIGHT - margin - (y - self.min_y) / (self.max_y - self.min_y) * (ANIM_HEIGHT - 2 * margin)
+        screen_y = ANIM_HEIGHT - margin - (y - self.min_y) / span_y * (ANIM_HEIGHT - 2 * margin)
         return (int(screen_x), int(screen_y))
 
+    def track_to_screen(self):
+        """Versión vectorizada de world_to_screen para todos los puntos de la pista."""
+        margin = TRACK_MARGIN
+        span_y = (self.max_y - self.min_y) or 1.0
+        screen_x = margin + (self.track.xs - self.xmin) / (self.xmax - self.xmin) * (SCREEN_WIDTH - 2 * margin)
+        screen_y = ANIM_HEIGHT - margin - (self.track.ys - self.min_y) / span_y * (ANIM_HEIGHT - 2 * margin)
+        return np.column_stack((screen_x, screen_y))
+
+    def build_static_layers(self):
+        """Pre-renderiza el cielo con la pista y el fondo del panel del quiz."""
+        key = (id(self.track), self.screen.get_size())
+        if key == self._layers_key:
+            return
+        self._layers_key = key
+        self.dirty.invalidate()
+
+        self._anim_layer = pygame.Surface(self.anim_rect.size).convert()
+        draw_vertical_gradient(self._anim_layer, (135, 206, 250), (25, 25, 112))
+        # Solo se dibujan los vértices que cambian la forma en más de medio píxel
+        track_points_screen = simplify_polyline(self.track_to_screen(), TRACK_SIMPLIFY_TOLERANCE)
+        self.vertex_report = {"samples": len(self.track), "drawn": len(track_points_screen)}
+        track_points_screen = track_points_screen.round().astype(int).tolist()
+        if len(track_points_screen) > 1:
+            pygame.draw.lines(self._anim_layer, COLOR_TRACK, False, track_points_screen, max(1, px(4)))
+
+        self._quiz_layer = pygame.Surface(self.quiz_rect.size).convert()
+        draw_vertical_gradient(self._quiz_layer, (60, 60, 60), (20, 20, 20))
+        progress_bar_rect = pygame.Rect(px(20), self.quiz_rect.height - px(30), self.quiz_rect.width - px(40), px(10))
+        pygame.draw.rect(self._quiz_layer, (100, 100, 100), progress_bar_rect, border_radius=px(5))
+
+        self._transition_surface = pygame.Surface(self.quiz_rect.size).convert()
+        self._transition_surface.fill((0, 0, 0))
+
     def draw_animation(self):
         """Dibuja la animación de la montaña rusa."""
+        self.build_static_layers()
         anim_surface = self.screen.subsurface(self.anim_rect)
-        draw_vertical_gradient(anim_surface, (135, 206, 250), (25, 25, 112))
-        track_points_screen = [self.world_to_screen(x, y) for (x, y) in self.track_points]
-        if len(track_points_screen) > 1:
-            pygame.draw.lines(anim_surface, COLOR_TRACK, False, track_points_screen, 4)
-        if int(self.car_index) >= len(self.track_points):
-            self.car_index = len(self.track_points) - 1
-        pos = self.world_to_screen(*self.track_points[int(self.car_index)])
-        shadow_pos = (pos[0] + 3, pos[1] + 3)
-        pygame.draw.circle(anim_surface, (0, 0, 0), shadow_pos, 12)
-        pygame.draw.circle(anim_surface, COLOR_CAR, pos, 10)
-        score_text = self.small_font.render(f"Respuestas correctas: {self.quiz_correct}", True, COLOR_TEXT)
-        anim_surface.blit(score_text, (20, 20))
+        if self.dirty.full:
+            anim_surface.blit(self._anim_layer, (0, 0))
+        else:
+            # Restaurar el fondo solo debajo de lo dibujado en el cuadro anterior
+            for rect in self._anim_dirty:
+                anim_surface.blit(self._anim_layer, rect, rect)
+        pos = self.world_to_screen(*self.track.position_at(self.state.progress * self.track.length))
+        shadow_pos = (pos[0] + px(3), pos[1] + px(3))
+        shadow_rect = pygame.draw.circle(anim_surface, (0, 0, 0), shadow_pos, px(12))
+        car_rect = pygame.draw.circle(anim_surface, COLOR_CAR, pos, px(10))
+        score_text = self.score_label.render(self.state.quiz_correct)
+        score_rect = anim_surface.blit(score_text, (px(20), px(20)))
+
+        drawn = [shadow_rect.union(car_rect), score_rect]
+        for rect in self._anim_dirty + drawn:
+            self.dirty.add(rect.move(self.anim_rect.topleft))
+        self._anim_dirty = drawn
 
     def draw_quiz(self):
         """Dibuja el panel del quiz."""
-        quiz_surface = self.screen.subsurface(self.quiz_rect)
-        draw_vertical_gradient(quiz_surface, (60, 60, 60), (20, 20, 20))
-        if self.current_question_index < len(self.quiz_questions):
-            q = self.quiz_questions[self.current_question_index]
-            question_text = q["question"]
-        else:
-            question_text = "¡Desafío completado!"
-        question_surface = self.font.render("Desafío: " + question_text, True, COLOR_TEXT)
-        quiz_surface.blit(question_surface, (20, 10))
+        self.build_static_layers()
         self.option_rects = []
-        mx, my = pygame.mouse.get_pos()
+        hover_index = None
+        mx, my = self.mouse_pos
         rel_mx = mx - self.quiz_rect.x
         rel_my = my - self.quiz_rect.y
-        if self.current_question_index < len(self.quiz_questions):
-            options = self.quiz_questions[self.current_question_index]["options"]
+        if self.state.current_question_index < len(self.state.quiz_questions):
+            options = self.state.quiz_questions[self.state.current_question_index]["options"]
             for i, opt in enumerate(options):
-                rect = pygame.Rect(20, 60 + i * 50, self.quiz_rect.width - 40, 40)
+                rect = pygame.Rect(px(20), px(60 + i * 50), self.quiz_rect.width - px(40), px(40))
                 self.option_rects.append((rect, opt))
                 if rect.collidepoint(rel_mx, rel_my):
-                    color = COLOR_OPTION_HOVER
-                else:
-                    color = COLOR_OPTION_BG
-                pygame.draw.rect(quiz_surface, color, rect, border_radius=8)
-                if rect.collidepoint(rel_mx, rel_my):
-                    pygame.draw.rect(quiz_surface, COLOR_TIMER, rect, 2, border_radius=8)
-                opt_surface = self.small_font.render(opt, True, (0, 0, 0))
-                text_rect = opt_surface.get_rect(center=rect.center)
-                quiz_surface.blit(opt_surface, text_rect)
-        remaining = max(0, int(self.question_time_limit - (time.time() - self.question_start_time)))
-        timer_surface = self.small_font.render(f"Tiempo: {remaining} seg", True, COLOR_TIMER)
-        quiz_surface.blit(timer_surface, (20, 260))
-        speed_surface = self.small_font.render(f"Velocidad: {self.speed_factor:.1f}", True, COLOR_TEXT)
-        quiz_surface.blit(speed_surface, (20, 290))
-        progress_surface = self.small_font.render(
-            f"Pregunta {min(self.current_question_index+1, len(self.quiz_questions))} de {len(self.quiz_questions)}", True, COLOR_TEXT)
-        quiz_surface.blit(progress_surface, (20, 320))
-        feedback_surface = self.small_font.render(self.feedback_message, True, COLOR_FEEDBACK)
-        quiz_surface.blit(feedback_surface, (20, 350))
-        bar_width = self.quiz_rect.width - 40
-        bar_height = 10
-        progress = (self.current_question_index) / len(self.quiz_questions)
-        progress_bar_rect = pygame.Rect(20, self.quiz_rect.height - 30, bar_width, bar_height)
-        pygame.draw.rect(quiz_surface, (100, 100, 100), progress_bar_rect, border_radius=5)
-        progress_fill_rect = pygame.Rect(20, self.quiz_rect.height - 30, int(bar_width * progress), bar_height)
-        pygame.draw.rect(quiz_surface, (0, 200, 0), progress_fill_rect, border_radius=5)
+                    hover_index = i
+        remaining = self.state.remaining_time()
 
-        if self.transition_alpha > 0:
-            transition_surface = pygame.Surface((self.quiz_rect.width, self.quiz_rect.height))
-            transition_surface.fill((0, 0, 0))
-            transition_surface.set_alpha(self.transition_alpha)
-            quiz_surface.blit(transition_surface, (0, 0))
-
-    def get_quiz_questions(self):
-        """Retorna una lista de 5 preguntas aleatorias para el quiz."""
-        pool_facil = [
-            {"question": "¿Cuánto es 5 + 3?", "options": ["10", "6", "8", "7"], "answer": "8"},
-            {"question": "¿Cuánto es 7 × 6?", "options": ["36", "42", "40", "48"], "answer": "42"},
-            {"question": "Si un triángulo tiene dos lados de 5 cm y 5 cm, ¿cómo se llama?", "options": ["Equilátero", "Escaleno", "Rectángulo","Isósceles"], "answer": "Isósceles"},
-            {"question": "¿Cuál es el resultado de 2²?", "options": ["4", "2", "8", "6"], "answer": "4"},
-            {"question": "¿Cuál es la raíz cuadrada de 81?", "options": ["8", "9", "7", "6"], "answer": "9"}
-        ]
-        pool_medio = [
-            {"question": "¿Cuánto es 12 ÷ 4?", "options": ["4", "3", "6", "2"], "answer": "3"},
-            {"question": "Si x + 3 = 10, ¿cuánto vale x?", "options": ["7", "10", "3", "13"], "answer": "7"},
-            {"question": "Si un cuadrado tiene un área de 16 cm², ¿cuánto mide cada lado?", "options": ["3 cm", "5 cm", "6 cm", "4 cm"], "answer": "4 cm"},
-            {"question": "¿Cuál es el valor de π aproximadamente?", "options": ["3.21", "3.41", "3.04", "3.14"], "answer": "3.14"},
-            {"question": "¿Cuál es la derivada de x³?", "options": ["3x", "x²", "3x²", "x³"], "answer": "3x²"}
-        ]
-        pool_dificil = [
-            {"question": "¿Cuál es la derivada de ln(x)?", "options": ["ln(x)", "1/x", "x", "e^x"], "answer": "1/x"},
-            {"question": "¿Cuál es la integral de x dx?", "options": ["(1/2)x² + C", "x + C", "x² + C", "e^x + C"], "answer": "(1/2)x² + C"},
-            {"question": "Si f(x) = x² + 2x, ¿cuál es f'(x)?", "options": ["x + 2", "x² + 2", "2x + 2", "2x"], "answer": "2x + 2"},
-            {"question": "¿Cuál es el área de un círculo de radio 5?", "options": ["25π", "10π", "5π", "50π"], "answer": "25π"},
-            {"question": "¿Cuál es la derivada de e^(3x)?", "options": ["3e^(3x)", "e^(3x)", "x*e^(3x)", "ln(e)*e^(3x)"], "answer": "3e^(3x)"}
-        ]
-        pool_muyDificil = [
-            {"question": "Si f(x) = e^x + ln(x), ¿cuál es f'(x)?", "options": ["ln(x) + 1/x", "e^x", "e^x + 1/x", "x e^x"], "answer": "e^x + 1/x"},
-            {"question": "Si la función f(x) = x³ - 3x² + 2x tiene un máximo, ¿dónde ocurre?", "options": ["x = 1", "x = 2", "x = 0", "x = -1"], "answer": "x = 1"},
-            {"question": "Si la hipotenusa de un triángulo rectángulo es 10 y un cateto es 6, ¿cuánto mide el otro cateto?", "options": ["4", "8", "6", "5"], "answer": "8"},
-            {"question": "¿Cuál es la integral de sec²(x) dx?", "options": ["cos(x) + C", "tan(x) + C", "sin(x) + C", "-tan(x) + C"], "answer": "tan(x) + C"},
-            {"question": "Si la serie geométrica infinita a + ar + ar² + ... converge, ¿qué condición debe cumplirse para r?", "options": ["r < -1", "|r| > 1", "r > 1", "|r| < 1"], "answer": "|r| < 1"}
-        ]
-        pool_einstein = [
-            {"question": "¿Cuál es la solución real de la ecuación x^4 - 5x² + 4 = 0?", "options": ["0, ±1", "±3, ±2", "±2, ±1", "±4, ±2"], "answer": "±2, ±1"},
-            {"question": "¿Cuál es la derivada de sinh(x)?", "options": ["sinh(x)", "cosh(x)", "-cosh(x)", "-sinh(x)"], "answer": "cosh(x)"},
-            {"question": "Si f(x) = x^x, ¿cuál es f'(x)?", "options": ["x^x(1 + ln(x))", "x^(x-1)", "ln(x)", "x^x * ln(x)"], "answer": "x^x(1 + ln(x))"},
-            {"question": "Si una matriz A tiene un determinante de 0, ¿qué significa?", "options": ["Es diagonal", "Es invertible", "Tiene traza 0", "Es singular"], "answer": "Es singular"},
-            {"question": "Si A es una matriz ortogonal, ¿qué se cumple para A⁻¹?", "options": ["A⁻¹ no existe", "A⁻¹ = -A", "A⁻¹ = A²", "A⁻¹ = Aᵀ"], "answer": "A⁻¹ = Aᵀ"}
-        ]
+        # El panel solo se redibuja cuando cambia algo visible
+        quiz_state = (self.state.current_question_index, hover_index, remaining, self.state.speed_factor,
+                      self.state.feedback_message, self.transition_alpha)
+        if quiz_state == self._quiz_state and not self.dirty.full:
+            return
+        self._quiz_state = quiz_state
+        self.dirty.add(self.quiz_rect)
 
-        if nivel == 1:
-            return random.sample(pool_facil, 5)
-        elif nivel == 2:
-            return random.sample(pool_medio, 5)
-        elif nivel == 3:
-            return random.sample(pool_dificil, 5)
-        elif nivel == 4:
-            return random.sample(pool_muyDificil, 5)
-        elif nivel == 5:
-            return random.sample(pool_einstein, 5)
+        quiz_surface = self.screen.subsurface(self.quiz_rect)
+        quiz_surface.blit(self._quiz_layer, (0, 0))
+        if self.state.current_question_index < len(self.state.quiz_questions):
+            q = self.state.quiz_questions[self.state.current_question_index]
+            question_text = q["question"]
+        else:
+            question_text = "¡Desafío completado!"
+        question_surface = self.text_cache.render(self.font, "Desafío: " + question_text, COLOR_TEXT)
+        quiz_surface.blit(question_surface, (px(20), px(10)))
+        for i, (rect, opt) in enumerate(self.option_rects):
+            if i == hover_index:
+                color = COLOR_OPTION_HOVER
+            else:
+                color = COLOR_OPTION_BG
+            pygame.draw.rect(quiz_surface, color, rect, border_radius=px(8))
+            if i == hover_index:
+                pygame.draw.rect(quiz_surface, COLOR_TIMER, rect, max(1, px(2)), border_radius=px(8))
+            opt_surface = self.text_cache.render(self.small_font, opt, (0, 0, 0))
+            text_rect = opt_surface.get_rect(center=rect.center)
+            quiz_surface.blit(opt_surface, text_rect)
+        timer_surface = self.timer_label.render(remaining)
+        quiz_surface.blit(timer_surface, (px(20), px(260)))
+        speed_surface = self.speed_label.render(self.state.speed_factor)
+        quiz_surface.blit(speed_surface, (px(20), px(290)))
+        progress_surface = self.progress_label.render(
+            min(self.state.current_question_index+1, len(self.state.quiz_questions)), len(self.state.quiz_questions))
+        quiz_surface.blit(progress_surface, (px(20), px(320)))
+        feedback_surface = self.feedback_label.render(self.state.feedback_message)
+        quiz_surface.blit(feedback_surface, (px(20), px(350)))
+        bar_width = self.quiz_rect.width - px(40)
+        bar_height = px(10)
+        progress = (self.state.current_question_index) / len(self.state.quiz_questions)
+        progress_fill_rect = pygame.Rect(px(20), self.quiz_rect.height - px(30), int(bar_width * progress), bar_height)
+        pygame.draw.rect(quiz_surface, (0, 200, 0), progress_fill_rect, border_radius=px(5))
+
+        if self.transition_alpha > 0:
+            self._transition_surface.set_alpha(self.transition_alpha)
+            quiz_surface.blit(self._transition_surface, (0, 0))
 
     def process_timeout(self):
         """Procesa el evento cuando se agota el tiempo de respuesta."""
-        self.feedback_message = "Tiempo agotado. Velocidad reducida."
-        self.speed_factor = max(0.5, self.speed_factor - 0.5)
-        self.unanswered_count += 1
-        self.current_question_index += 1
-        self.question_start_time = time.time()
+        index, speed = self.state.current_question_index, self.state.speed_factor
+        self.state.process_timeout()
+        self._record_timeout(index, speed)
         self.transition_alpha = 200
 
     def process_answer(self, selected_option):
         """Procesa la respuesta seleccionada por el usuario."""
-        q = self.quiz_questions[self.current_question_index]
-        if selected_option == q["answer"]:
-            self.feedback_message = "¡Correcto! Velocidad aumentada."
-            self.quiz_correct += 1
-            self.speed_factor = min(5.0, self.speed_factor + 0.5)
-        else:
-            self.feedback_message = f"Incorrecto. La respuesta es: {q['answer']}. Velocidad reducida."
-            self.speed_factor = max(0.5, self.speed_factor - 0.5)
-        self.current_question_index += 1
-        self.question_start_time = time.time()
+        index, speed = self.state.current_question_index, self.state.speed_factor
+        q = self.state.current_question()
+        latency = self.state.clock() - self.state.question_start_time
+        correct = self.state.process_answer(selected_option)
+        self.session.answer(index, q["options"].index(selected_option), latency, correct,
+                            speed, self.state.speed_factor, q.get("generated", False))
         self.transition_alpha = 200
 
+    def _record_timeout(self, index, speed):
+        q = self.state.quiz_questions[index]
+        self.session.timeout(index, self.state.question_time_limit, speed, self.state.speed_factor,
+                             q.get("generated", False))
+
     def update(self, dt):
         """Actualiza la posición del carrito y verifica el temporizador del quiz."""
-        if not self.game_over:
-            self.car_index += self.speed_factor * dt * 50
-            if self.car_index >= len(self.track_points) - 1:
-                self.game_over = True
-            if self.current_question_index < len(self.quiz_questions):
-                elapsed = time.time() - self.question_start_time
-                if elapsed >= self.question_time_limit:
-                    self.process_timeout()
-                    if self.unanswered_count >= 2:
-                        self.game_over = True
-            if self.unanswered_count >= 2:
-                self.game_over = True
+        index, speed = self.state.current_question_index, self.state.speed_factor
+        if self.state.update(dt):
+            self._record_timeout(index, speed)
+            self.transition_alpha = 200
 
         if self.transition_alpha > 0:
             self.transition_alpha = max(0, self.transition_alpha - 5)
 
     def show_final_modal(self):
         """Muestra una ventana modal con los resultados finales."""
-        modal_width = 600
-        modal_height = 350
+        modal_width = px(600)
+        modal_height = px(350)
         modal_rect = pygame.Rect((SCREEN_WIDTH - modal_width) // 2,
                                  (SCREEN_HEIGHT - modal_height) // 2,
                                  modal_width, modal_height)
         modal_surface = pygame.Surface((modal_width, modal_height))
         draw_vertical_gradient(modal_surface, (50, 50, 50), (10, 10, 10))
-        pygame.draw.rect(modal_surface, COLOR_MODAL_BORDER, modal_surface.get_rect(), 4, border_radius=10)
+        pygame.draw.rect(modal_surface, COLOR_MODAL_BORDER, modal_surface.get_rect(), max(1, px(4)), border_radius=px(10))
 
-        elapsed = time.time() - self.game_start_time
-        outcome = "¡Éxito en la Montaña Rusa!" if self.quiz_correct >= 3 else "Fracaso en la Aventura"
-        result_text = f"{outcome}\nRespuestas correctas: {self.quiz_correct}/{len(self.quiz_questions)}\nTiempo: {elapsed:.1f} seg"
+        elapsed = self.state.elapsed()
+        outcome = "¡Éxito en la Montaña Rusa!" if self.state.success else "Fracaso en la Aventura"
+        result_text = f"{outcome}\nRespuestas correctas: {self.state.quiz_correct}/{len(self.state.quiz_questions)}\nTiempo: {elapsed:.1f} seg"
         lines = result_text.split('\n')
         for i, line in enumerate(lines):
             text_surf = self.large_font.render(line, True, COLOR_TEXT)
-            modal_surface.blit(text_surf, ((modal_width - text_surf.get_width()) // 2, 40 + i * 60))
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+            modal_surface.blit(text_surf, ((modal_width - text_surf.get_width()) // 2, px(40 + i * 60)))
+        darken(self.screen, 200)
         self.screen.blit(modal_surface, modal_rect.topleft)
-        pygame.display.flip()
-        pygame.time.delay(4000)
+        if not self.offscreen:
+            display.flip()
 
     def run(self):
-        """Bucle principal del juego."""
-        self.show_story()
+        """Bucle principal del juego; al terminar, la fuente de entrada guarda o verifica la partida."""
+        try:
+            self._run()
+        finally:
+            self.input.close(self.state)
+
+    def _run(self):
+        if self.input.replaying:
+            # La historia no forma parte de la grabación: se pasa directo al fundido de entrada
+            self.fade = Fade("in")
+        else:
+            self.show_story()
+        self.input.start()
+        self.profiler.begin()
+        self.dirty.invalidate()
+        modal_remaining = None
         running = True
         while running:
-            dt = self.clock.tick(60) / 1000.0
-            for event in pygame.event.get():
+            dt, events = self.input.next_frame()
+            if dt is None:
+                return
+            self.profiler.frame()
+            self.game_clock.advance(dt)
+            self.mouse_pos = self.input.mouse_pos
+            if modal_remaining is not None:
+                # Resultados finales: se cierran solos o con un clic/tecla, sin bloquear la ventana
+                modal_remaining -= dt
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        return
+                    if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+                        modal_remaining = 0
+                if modal_remaining <= 0:
+                    running = False
+                continue
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                     return
+                elif self.fade is not None and self.fade.direction == "out":
+                    continue
                 elif event.type == pygame.MOUSEBUTTONDOWN:
-                    mx, my = pygame.mouse.get_pos()
+                    mx, my = event.pos
                     if self.quiz_rect.collidepoint(mx, my):
                         rel_x = mx - self.quiz_rect.x
                         rel_y = my - self.quiz_rect.y
@@ -309,12 +371,37 @@ class RollerCoasterGame:
                             if rect.collidepoint(rel_x, rel_y):
                                 self.process_answer(opt)
                                 break
-            self.update(dt)
-            self.screen.fill(COLOR_BG)
+            self.profiler.mark("eventos")
+            if self.fade is None or self.fade.direction == "in":
+                self.update(dt)
+            self.input.after_update(self.state)
+            if self.publisher is not None:
+                self.publisher.publish(self.state, force=self.state.game_over)
+            self.profiler.mark("update")
+            if self.fade is not None:
+                # El fundido cubre toda la pantalla: se redibuja completa
+                self.dirty.invalidate()
             self.draw_animation()
+            self.profiler.mark("draw_animation")
             self.draw_quiz()
-            pygame.display.flip()
-            if self.game_over:
-                fade_out(self.screen, speed=10)
-                self.show_final_modal()
-                running = False
+            self.profiler.mark("draw_quiz")
+            overlay_rect = self.profiler.draw_overlay(self.screen, self.small_font)
+            if overlay_rect is not None:
+                # Se restaura con el fondo del cielo en el cuadro siguiente
+                self._anim_dirty.append(overlay_rect)
+                self.dirty.add(overlay_rect)
+            if self.fade is not None:
+                self.fade.update(dt)
+                self.fade.draw(self.screen)
+            self.dirty.present()
+            self.profiler.mark("present")
+            if self.fade is not None and self.fade.done:
+                if self.fade.direction == "out":
+                    self.session.finish(self.state.result())
+                    self.show_final_modal()
+                    modal_remaining = MODAL_DURATION
+                else:
+                    self.dirty.invalidate()
+                self.fade = None
+            elif self.state.game_over and self.fade is None:
+                self.fade = Fade("out")
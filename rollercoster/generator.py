@@ -0,0 +1,325 @@
+# generator.py
+"""Preguntas de cálculo y álgebra generadas con SymPy a partir de plantillas.
+
+Generar una pregunta cuesta milisegundos de SymPy, así que los lotes se
+preparan en el pool de procesos de `workers` y se guardan en una reserva por
+nivel (también en disco, para la próxima ejecución). Al comenzar una partida
+solo se toman las preguntas que ya estén listas: si la reserva está vacía se
+usan únicamente las del banco, nunca se espera.
+"""
+import json
+import os
+import random
+import threading
+import time
+
+from rollercoster.config import CACHE_DIR, GENERATED_PER_GAME, GENERATED_BATCH, GENERATED_TIMEOUT
+from rollercoster.questions import NIVEL_POR_DEFECTO, get_quiz_questions
+
+SUPERINDICES = str.maketrans("0123456789-", "⁰¹²³⁴⁵⁶⁷⁸⁹⁻")
+
+# Intentos por pregunta antes de descartar la plantilla (p. ej. si no hay distractores válidos)
+MAX_INTENTOS = 5
+
+
+# --- Formato de expresiones con la notación de las preguntas del banco ---
+
+def _coeficiente(c):
+    if c == 1:
+        return ""
+    if c == -1:
+        return "-"
+    if c.is_Integer:
+        return str(c)
+    signo = "-" if c < 0 else ""
+    return f"{signo}({abs(c.p)}/{c.q})"
+
+
+def _argumento(expr):
+    texto = formato(expr)
+    return texto if expr.is_Symbol else f"({texto})"
+
+
+def _factor(f):
+    import sympy as sp
+    if f.is_Pow and f.exp.is_Integer and f.exp > 0:
+        return _argumento(f.base) + str(f.exp).translate(SUPERINDICES)
+    if f.is_Pow:
+        return f"{_argumento(f.base)}^{_argumento(f.exp)}"
+    if isinstance(f, sp.exp):
+        return "e^" + _argumento(f.args[0])
+    if isinstance(f, sp.log):
+        return f"ln({formato(f.args[0])})"
+    if isinstance(f, sp.Function):
+        return f"{type(f).__name__}({formato(f.args[0])})"
+    if f.is_Add:
+        return f"({formato(f)})"
+    return sp.sstr(f)
+
+
+def _termino(t):
+    coef, resto = t.as_coeff_Mul()
+    if resto == 1:
+        return str(coef)
+    texto = _coeficiente(coef)
+    for f in resto.as_ordered_factors():
+        parte = _factor(f)
+        # "2x sin(x)" en lugar de "2xsin(x)"
+        if texto and texto[-1] not in "-)" and parte[0].isalpha() and parte[0] not in "xe":
+            texto += " "
+        texto += parte
+    return texto
+
+
+def formato(expr):
+    """Texto legible de una expresión: 3x², e^(3x), (1/2)x², ln(x)."""
+    texto = ""
+    for i, t in enumerate(expr.as_ordered_terms()):
+        parte = _termino(t)
+        if i == 0:
+            texto = parte
+        elif parte.startswith("-"):
+            texto += " - " + parte[1:]
+        else:
+            texto += " + " + parte
+    return texto
+
+
+def _formato_raices(raices):
+    return ", ".join(f"x = {r}" for r in sorted(raices))
+
+
+# --- Plantillas: cada una retorna (tema, enunciado, respuesta, candidatos a distractor) ---
+
+def _ecuacion_lineal(rng, x):
+    import sympy as sp
+    a, sol, b = rng.randint(2, 9), rng.randint(-9, 9), rng.randint(1, 20)
+    c = a * sol + b
+    respuesta = sp.solve(sp.Eq(a * x + b, c), x)[0]
+    candidatos = [sp.Integer(c - b), sp.Rational(c + b, a), sp.Integer(c) / a, -respuesta,
+                  respuesta + 1, respuesta - 1]
+    return "algebra", f"Si {a}x + {b} = {c}, ¿cuánto vale x?", respuesta, candidatos
+
+
+def _derivada_potencia(rng, x):
+    import sympy as sp
+    a, n = rng.randint(1, 9), rng.randint(2, 6)
+    f = a * x**n
+    respuesta = sp.diff(f, x)
+    candidatos = [a * n * x**n, a * x**(n - 1), a * (n - 1) * x**(n - 1),
+                  a * n * x**(n + 1), f / (n + 1) * x]
+    return "calculo", f"¿Cuál es la derivada de {formato(f)}?", respuesta, candidatos
+
+
+def _derivada_cadena(rng, x):
+    import sympy as sp
+    b = rng.choice([-4, -3, -2, 2, 3, 4, 5])
+    g = rng.choice([sp.exp, sp.sin, sp.cos])
+    f = g(b * x)
+    respuesta = sp.diff(f, x)
+    candidatos = [sp.diff(g(x), x).subs(x, b * x), -respuesta, f * b * x,
+                  b * f, f / b, b**2 * sp.diff(g(x), x).subs(x, b * x)]
+    return "calculo", f"¿Cuál es la derivada de {formato(f)}?", respuesta, candidatos
+
+
+def _integral_potencia(rng, x):
+    import sympy as sp
+    n = rng.randint(1, 5)
+    a = (n + 1) * rng.randint(1, 3) if rng.random() < 0.5 else rng.randint(1, 9)
+    f = a * x**n
+    respuesta = sp.integrate(f, x)
+    candidatos = [sp.diff(f, x), a * x**(n + 1), a * x**(n + 1) / n, f * x / 2, a * x**(n - 1) / (n - 1 or 2)]
+    return "calculo", f"¿Cuál es la integral de {formato(f)} dx?", respuesta, candidatos
+
+
+def _derivada_producto(rng, x):
+    import sympy as sp
+    n = rng.randint(2, 4)
+    g = rng.choice([sp.exp(x), sp.sin(x), sp.cos(x), sp.log(x)])
+    f = x**n * g
+    respuesta = sp.diff(f, x)
+    dg = sp.diff(g, x)
+    candidatos = [n * x**(n - 1) * dg, x**n * dg, n * x**(n - 1) * g,
+                  n * x**(n - 1) * g - x**n * dg, x**n * g + n * x**n * dg]
+    return "calculo", f"Si f(x) = {formato(f)}, ¿cuál es f'(x)?", respuesta, candidatos
+
+
+def _raices_cuadratica(rng, x):
+    import sympy as sp
+    r1, r2 = rng.sample([r for r in range(-6, 7) if r != 0], 2)
+    p = sp.expand((x - r1) * (x - r2))
+    respuesta = tuple(sorted(sp.solve(p, x)))
+    candidatos = [(-r1, -r2), (r1, -r2), (-r1, r2), (r1 + r2, r1 * r2), (r1 + 1, r2 - 1)]
+    return "algebra", f"¿Cuáles son las raíces de {formato(p)} = 0?", respuesta, candidatos
+
+
+PLANTILLAS = {
+    1: [_ecuacion_lineal],
+    2: [_ecuacion_lineal, _derivada_potencia],
+    3: [_derivada_potencia, _derivada_cadena, _integral_potencia],
+    4: [_derivada_cadena, _integral_potencia, _derivada_producto],
+    5: [_derivada_producto, _raices_cuadratica],
+}
+
+
+def _texto(valor, integral):
+    if isinstance(valor, tuple):
+        return _formato_raices(valor)
+    texto = formato(valor)
+    return texto + " + C" if integral else texto
+
+
+def _equivalentes(a, b):
+    """Compara respuestas en forma simbólica, no por su texto."""
+    import sympy as sp
+    if isinstance(a, tuple) or isinstance(b, tuple):
+        return sorted(a) == sorted(b)
+    return sp.expand(a - b) == 0
+
+
+def generate_question(level, rng):
+    """Genera una pregunta verificada del nivel, o None si la plantilla no dio distractores."""
+    import sympy as sp
+    x = sp.Symbol('x')
+    plantilla = rng.choice(PLANTILLAS.get(level, PLANTILLAS[NIVEL_POR_DEFECTO]))
+    tema, enunciado, respuesta, candidatos = plantilla(rng, x)
+    integral = plantilla is _integral_potencia
+    # Respuesta y distractores en forma expandida, para que la forma no delate a la correcta
+    if not isinstance(respuesta, tuple):
+        respuesta = sp.expand(respuesta)
+    correcta = _texto(respuesta, integral)
+
+    opciones = [correcta]
+    rng.shuffle(candidatos)
+    for candidato in candidatos:
+        if isinstance(candidato, tuple):
+            if len(set(candidato)) < len(candidato):
+                continue
+            candidato = tuple(sorted(candidato))
+        else:
+            candidato = sp.expand(candidato)
+        texto = _texto(candidato, integral)
+        if texto not in opciones and not _equivalentes(candidato, respuesta):
+            opciones.append(texto)
+        if len(opciones) == 4:
+            break
+    if len(opciones) < 4:
+        return None
+    rng.shuffle(opciones)
+    return {"level": level, "topic": tema, "question": enunciado,
+            "options": opciones, "answer": correcta, "generated": True}
+
+
+def generate(level, count, seed):
+    """Genera `count` preguntas distintas del nivel (se ejecuta en el proceso trabajador)."""
+    rng = random.Random(seed)
+    preguntas, enunciados = [], set()
+    for _ in range(count * MAX_INTENTOS):
+        if len(preguntas) == count:
+            break
+        q = generate_question(level, rng)
+        if q is not None and q["question"] not in enunciados:
+            enunciados.add(q["question"])
+            preguntas.append(q)
+    return preguntas
+
+
+# --- Reserva de preguntas generadas, por nivel ---
+
+class GeneratedPool:
+    """Preguntas generadas listas para usar, repuestas en segundo plano.
+
+    `take` nunca espera: retorna las que haya y, si la reserva bajó de un
+    lote, pide otro al pool de procesos. Las que sobran se guardan en
+    `directory` para no empezar vacíos en la próxima ejecución.
+    """
+
+    def __init__(self, batch=GENERATED_BATCH, directory=None, timeout=GENERATED_TIMEOUT):
+        self.batch = batch
+        self.directory = directory
+        self.timeout = timeout
+        self._stock = {}
+        self._pending = {}
+        self._lock = threading.RLock()
+
+    def prefetch(self, level):
+        """Pide un lote si la reserva del nivel no alcanza y no hay uno en camino."""
+        with self._lock:
+            self._collect(level)
+            if len(self._reserva(level)) >= self.batch or level in self._pending:
+                return
+            from rollercoster import workers
+            seed = random.randrange(2**32)
+            self._pending[level] = (workers.submit(generate, level, self.batch, seed), time.monotonic())
+
+    def take(self, level, k):
+        """Retorna hasta `k` preguntas ya generadas, sin esperar."""
+        with self._lock:
+            self._collect(level)
+            reserva = self._reserva(level)
+            tomadas = reserva[:k]
+            del reserva[:k]
+            if tomadas:
+                self._save(level)
+            self.prefetch(level)
+            return tomadas
+
+    def _reserva(self, level):
+        reserva = self._stock.get(level)
+        if reserva is None:
+            reserva = self._stock[level] = self._load(level)
+        return reserva
+
+    def _collect(self, level):
+        pendiente = self._pending.get(level)
+        if pendiente is None:
+            return
+        result, inicio = pendiente
+        if result.ready():
+            del self._pending[level]
+            try:
+                self._reserva(level).extend(result.get())
+                self._save(level)
+            except Exception:
+                pass
+        elif time.monotonic() - inicio > self.timeout:
+            # El pool pudo reiniciarse por una pista que no terminó: se vuelve a pedir
+            del self._pending[level]
+
+    def _path(self, level):
+        return os.path.join(self.directory, f"nivel-{level}.jsonl")
+
+    def _load(self, level):
+        if self.directory is None:
+            return []
+        try:
+            with open(self._path(level), encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError):
+            return []
+
+    def _save(self, level):
+        if self.directory is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(level)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                for q in self._reserva(level):
+                    f.write(json.dumps(q, ensure_ascii=False) + "\n")
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+
+
+generated_pool = GeneratedPool(directory=os.path.join(CACHE_DIR, "generated"))
+
+
+def quiz_questions(level, rng=random):
+    """Preguntas del banco con hasta GENERATED_PER_GAME reemplazadas por generadas."""
+    questions = get_quiz_questions(level, rng)
+    nivel = level if level in PLANTILLAS else NIVEL_POR_DEFECTO
+    generadas = generated_pool.take(nivel, min(GENERATED_PER_GAME, len(questions)))
+    for q, i in zip(generadas, rng.sample(range(len(questions)), len(generadas))):
+        questions[i] = q
+    return questions
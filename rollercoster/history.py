@@ -0,0 +1,85 @@
+# history.py
+import sys
+import time
+
+import pygame
+
+from rollercoster.config import SCREEN_WIDTH, SCREEN_HEIGHT, COLOR_TEXT, COLOR_TIMER, px
+from rollercoster.drawing import draw_vertical_gradient
+from rollercoster.scheduler import FrameScheduler
+from rollercoster import display, telemetry
+from rollercoster.text_cache import get_font
+
+# Columnas de la tabla por nivel: título y posición x (píxeles de diseño)
+COLUMNAS = [("Nivel", 60), ("Partidas", 180), ("Éxitos", 330), ("Correctas", 460),
+            ("Respuesta media", 620), ("Mejor tiempo", 830)]
+
+
+def _filas_niveles(summary):
+    filas = []
+    for nivel, datos in sorted(summary["levels"].items(), key=lambda item: int(item[0])):
+        nombre = nivel if nivel != "0" else "Libre"
+        correctas = f"{datos['correct']}/{datos['questions']}"
+        latencia = f"{datos['latency'] / datos['answered']:.1f} seg" if datos["answered"] else "-"
+        mejor = f"{datos['best_time']:.1f} seg" if datos["best_time"] is not None else "-"
+        filas.append([nombre, str(datos["sessions"]), str(datos["success"]), correctas, latencia, mejor])
+    return filas
+
+
+def _filas_recientes(summary):
+    filas = []
+    for partida in summary["recent"]:
+        fecha = time.strftime("%d/%m %H:%M", time.localtime(partida["date"]))
+        resultado = "Éxito" if partida["success"] else "Fracaso"
+        filas.append(f"{fecha}   Nivel {partida['level']}   {resultado}   "
+                     f"{partida['correct']}/{partida['questions']} correctas   {partida['time']:.1f} seg")
+    return filas
+
+
+def dibujar_historial(surface, summary):
+    """Dibuja la tabla por nivel y las últimas partidas a partir del resumen."""
+    title_font = get_font("Arial", px(48))
+    font = get_font("Arial", px(24))
+    small_font = get_font("Arial", px(20))
+
+    draw_vertical_gradient(surface, (10, 10, 40), (0, 0, 0))
+    titulo = title_font.render("Historial", True, COLOR_TEXT)
+    surface.blit(titulo, ((SCREEN_WIDTH - titulo.get_width()) // 2, px(60)))
+
+    filas = _filas_niveles(summary)
+    y = px(170)
+    if not filas:
+        vacio = font.render("Todavía no hay partidas registradas.", True, COLOR_TEXT)
+        surface.blit(vacio, ((SCREEN_WIDTH - vacio.get_width()) // 2, y))
+    else:
+        for titulo_columna, x in COLUMNAS:
+            surface.blit(font.render(titulo_columna, True, COLOR_TIMER), (px(x), y))
+        for fila in filas:
+            y += px(40)
+            for valor, (_, x) in zip(fila, COLUMNAS):
+                surface.blit(font.render(valor, True, COLOR_TEXT), (px(x), y))
+
+        y += px(80)
+        surface.blit(font.render("Últimas partidas", True, COLOR_TIMER), (px(60), y))
+        for linea in _filas_recientes(summary):
+            y += px(34)
+            surface.blit(small_font.render(linea, True, COLOR_TEXT), (px(60), y))
+
+    pie = small_font.render("Haz clic o presiona una tecla para volver", True, COLOR_TEXT)
+    surface.blit(pie, ((SCREEN_WIDTH - pie.get_width()) // 2, SCREEN_HEIGHT - px(80)))
+
+
+def mostrar_historial():
+    """Pantalla de historial: se dibuja una vez y espera un clic o una tecla."""
+    surface = display.get_surface()
+    dibujar_historial(surface, telemetry.telemetry_log.summary())
+    display.flip()
+
+    scheduler = FrameScheduler()
+    while True:
+        for event in scheduler.wait_events():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+                return
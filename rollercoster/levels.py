@@ -1,14 +1,24 @@
 
 import pygame
-import pygame_menu
-from rollercoster.config import SCREEN_WIDTH, SCREEN_HEIGHT
-from rollercoster.transitions import fade_in, fade_out
-from rollercoster.game import RollerCoasterGame
-
-def cambiar_opacidad(imagen):
-    imagen = imagen.copy()  # Crear una copia para no modificar la original
-    imagen.fill((150, 150, 150, 255), special_flags=pygame.BLEND_RGBA_MULT)
-    return imagen
+from rollercoster.transitions import Fade, run_fade
+from rollercoster.dirty import DirtyRects
+from rollercoster.scheduler import FrameScheduler
+from rollercoster.profiler import get_profiler
+from rollercoster.widgets import Button, ButtonGroup
+from rollercoster import assets, display, workers
+
+# Imágenes de la pantalla de niveles
+FONDO_NIVELES = "background-levels.png"
+
+# Niveles: imagen del botón, área de clic (píxeles de diseño) y parámetros de la pista
+NIVELES = [
+    ("level-1.png", (190, 193, 296, 201), {'func': '-10 + 100/(x+5)', 'xmin': -3, 'xmax' : 10}),
+    ("level-2.png", (497, 193, 296, 201), {'func': '-0.2*x**2 + 5', 'xmin': 0, 'xmax' : 10}),
+    ("level-3.png", (190, 405, 296, 201), {'func': '10 - x**2', 'xmin': -10, 'xmax' : 10}),
+    ("level-4.png", (497, 405, 296, 201), {'func': '-0.0002*x**5 + 0.01*x**3', 'xmin': -10, 'xmax' : 10}),
+    ("level-5.png", (366, 643, 297, 201), {'func': '-0.01*x**3 + 0.2*x', 'xmin': -10, 'xmax' : 10}),
+]
+ZONA_CREAR_NIVEL = display.scale_rect((365, 910, 299, 86))
 
 def start_game_from_menu(values, level):
     try:
@@ -24,93 +34,83 @@ def start_game_from_menu(values, level):
     except:
         xmax = 10
 
-    surface = pygame.display.get_surface()
-    fade_out(surface, speed=10)
-    game = RollerCoasterGame(func_str, xmin, xmax, level)
-    game.run()
-    fade_in(surface, speed=10)
-    mostrar_nivel()
+    # La pista se prepara en el pool de procesos mientras se reproduce el fundido;
+    # si ya se pidió al pasar el mouse sobre el nivel, se reutiliza ese pedido
+    pedido = workers.prefetch(func_str, xmin, xmax)
 
-def mostrar_nivel():
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    fondo = pygame.image.load("imagen/background-levels.png")
-    level1 = pygame.image.load("imagen/level-1.png")
-    level2 = pygame.image.load("imagen/level-2.png")
-    level3 = pygame.image.load("imagen/level-3.png")
-    level4 = pygame.image.load("imagen/level-4.png")
-    level5 = pygame.image.load("imagen/level-5.png")
+    surface = display.get_surface()
+    run_fade(surface, Fade("out"))
+    track = workers.wait(pedido, on_frame=pygame.event.pump)
 
+    from rollercoster.game import RollerCoasterGame
+    game = RollerCoasterGame(func_str, xmin, xmax, level, track=track)
+    game.run()
+    mostrar_nivel(con_fundido=True)
 
-    level1_origial = level1.copy()
-    level2_origial = level2.copy()
-    level3_origial = level3.copy()
-    level4_origial = level4.copy()
-    level5_origial = level5.copy()
+def crear_botones():
+    """Crea un botón por nivel; la acción guarda la función y el rango de la pista."""
+    return ButtonGroup([
+        Button(imagen, zona, action=(valores, nivel))
+        for nivel, (imagen, zona, valores) in enumerate(NIVELES, start=1)
+    ])
+
+def mostrar_nivel(con_fundido=False):
+    pygame.init()
+    screen = display.set_mode()
+    # Las imágenes se cargan de disco solo la primera vez que se entra a la pantalla
+    fondo = assets.load_image(FONDO_NIVELES, alpha=False)
+    botones = crear_botones()
+    dirty = DirtyRects()
+    scheduler = FrameScheduler()
+    profiler = get_profiler("niveles")
+    profiler.begin()
+    fade = Fade("in") if con_fundido else None
 
     running = True
     while running:
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-
-        level1 = level1_origial
-        level2 = level2_origial
-        level3 = level3_origial
-        level4 = level4_origial
-        level5 = level5_origial
-
-
-        if (190 <= mouse_x <= 485) and (193 <= mouse_y <= 393):
-            level1 = cambiar_opacidad(level1) 
-        else:
-            level1 = level1_origial
-        if (497 <= mouse_x <= 792) and (193 <= mouse_y <= 393):
-            level2 = cambiar_opacidad(level2) 
-        else:
-            level2 = level2_origial
-        if (190 <= mouse_x <= 485) and (405 <= mouse_y <= 605):
-            level3 = cambiar_opacidad(level3) 
-        else:
-            level3 = level3_origial
-        if (497 <= mouse_x <= 792) and (405 <= mouse_y <= 605):
-            level4 = cambiar_opacidad(level4) 
-        else:
-            level4 = level4_origial
-        if (366 <= mouse_x <= 662) and (643 <= mouse_y <= 843):
-            level5 = cambiar_opacidad(level5) 
-        else:
-            level5 = level5_origial
-
-
-        for event in pygame.event.get():
+        profiler.frame()
+        events = scheduler.wait_events(animating=dirty.full or fade is not None)
+        profiler.mark("espera")
+
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return
             
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if (190 <= mouse_x <= 485) and (193 <= mouse_y <= 393):
-                    start_game_from_menu({'func': '-10 + 100/(x+5)', 'xmin': -3, 'xmax' : 10}, level=1)
-                if (497 <= mouse_x <= 792) and (193 <= mouse_y <= 393):
-                    start_game_from_menu({'func': '-0.2*x**2 + 5', 'xmin': 0, 'xmax' : 10}, level=2)
-                if (190 <= mouse_x <= 485) and (405 <= mouse_y <= 605):
-                    start_game_from_menu({'func': '10 - x**2', 'xmin': -10, 'xmax' : 10}, level=3)
-                if (497 <= mouse_x <= 792) and (405 <= mouse_y <= 605):
-                    start_game_from_menu({'func': '-0.0002*x**5 + 0.01*x**3', 'xmin': -10, 'xmax' : 10}, level=4)
-                if (366 <= mouse_x <= 662) and (643 <= mouse_y <= 843):
-                    start_game_from_menu({'func': '-0.01*x**3 + 0.2*x', 'xmin': -10, 'xmax' : 10}, level=5)
+                boton = botones.hit_test(event.pos)
+                if boton is not None:
+                    valores, nivel = boton.action
+                    start_game_from_menu(valores, level=nivel)
 
                 # Boton crear nivel
-                if (365 <= mouse_x <= 663) and (910 <= mouse_y <= 995):
+                if ZONA_CREAR_NIVEL.collidepoint(event.pos):
                     print("Pressed")         
 
+        profiler.mark("eventos")
+        cambiados = botones.update(display.mouse_pos(), pygame.mouse.get_pressed()[0])
+        if fade is not None:
+            dirty.invalidate()
+        if not cambiados and not dirty.full:
+            continue
+        for boton in cambiados:
+            dirty.add(boton.dirty_rect)
+            if boton.state != "normal":
+                # Se empieza a preparar la pista apenas el mouse pasa sobre el nivel
+                valores, _ = boton.action
+                workers.prefetch(valores['func'], valores['xmin'], valores['xmax'])
 
         screen.blit(fondo, (0, 0))
-        screen.blit(level1, (0, 0))
-        screen.blit(level2, (0, 0))
-        screen.blit(level3, (0, 0))
-        screen.blit(level4, (0, 0))
-        screen.blit(level5, (0, 0))
+        botones.draw(screen)
+        if fade is not None:
+            fade.update(scheduler.dt)
+            fade.draw(screen)
+            if fade.done:
+                fade = None
+        profiler.mark("dibujo")
     
-        pygame.display.flip()
+        dirty.present()
+        profiler.mark("present")
 
 
 
@@ -1,101 +1,95 @@
 # menu.py
 import sys
 import pygame
-import pygame_menu
-from rollercoster.config import SCREEN_WIDTH, SCREEN_HEIGHT
-from rollercoster.transitions import fade_in
-from rollercoster.game import RollerCoasterGame
-from rollercoster.levels import mostrar_nivel
+from rollercoster.config import TRACK_POINTS
+from rollercoster.levels import mostrar_nivel, NIVELES, FONDO_NIVELES
+from rollercoster import startup, warmup
+from rollercoster.dirty import DirtyRects
+from rollercoster.scheduler import FrameScheduler
+from rollercoster.profiler import get_profiler
+from rollercoster.widgets import Button, ButtonGroup
+from rollercoster import assets, display
 
 
-pygame.init()
+# Imágenes del menú (se cargan una sola vez a través del gestor de recursos)
+FONDO_MENU = "background-menu.png"
 
-# Cargar imágenes
-fondo = pygame.image.load("imagen/background-menu.png")
-jugarButton = pygame.image.load("imagen/button-jugar.png")
-historialButton = pygame.image.load("imagen/button-historial.png")
-instrtuccionesButton = pygame.image.load("imagen/button-instrucciones.png")
-creditosButton = pygame.image.load("imagen/button-creditos.png")
-
-# Guardar imágenes originales para restaurarlas después
-jugarButton_original = jugarButton.copy()
-historialButton_original = historialButton.copy()
-instrtuccionesButton_original = instrtuccionesButton.copy()
-creditosButton_original = creditosButton.copy()
-
-# Coordenadas botón 
+# Coordenadas botón (píxeles de diseño)
 global_x1, global_x2 = 376, 635
 
-def cambiar_opacidad(imagen):
-    imagen = imagen.copy()  # Crear una copia para no modificar la original
-    imagen.fill((150, 150, 150, 255), special_flags=pygame.BLEND_RGBA_MULT)
-    return imagen
+def crear_botones():
+    """Crea los botones del menú con su área de clic y su acción."""
+    ancho = global_x2 - global_x1 + 1
+    return ButtonGroup([
+        Button("button-jugar.png", (global_x1, 440, ancho, 99), action="jugar"),
+        Button("button-historial.png", (global_x1, 558, ancho, 95), action="historial"),
+        Button("button-instrucciones.png", (global_x1, 672, ancho, 97), action="instrucciones"),
+        Button("button-creditos.png", (global_x1, 788, ancho, 95), action="creditos"),
+    ])
 
 def menu():
-    global jugarButton, historialButton, instrtuccionesButton, creditosButton  # Declarar variables globales
-    
     pygame.init()
-    surface = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    fade_in(surface, speed=10)
-    
-    while True:
-        events = pygame.event.get()
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+    surface = display.set_mode()
+
+    # Cargar imágenes
+    fondo = assets.load_image(FONDO_MENU, alpha=False)
+    botones = crear_botones()
 
-        # Restaurar imágenes originales antes de modificar
-        jugarButton = jugarButton_original
-        historialButton = historialButton_original
-        instrtuccionesButton = instrtuccionesButton_original
-        creditosButton = creditosButton_original
+    # Imágenes de la pantalla de niveles pendientes de cargar mientras el menú está en reposo
+    pendientes = [FONDO_NIVELES] + [imagen for imagen, _, _ in NIVELES]
+
+    dirty = DirtyRects()
+    scheduler = FrameScheduler()
+    profiler = get_profiler("menu")
+    profiler.begin()
+
+    while True:
+        profiler.frame()
+        events = scheduler.wait_events(animating=dirty.full)
+        profiler.mark("espera")
 
         for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
 
-            if (global_x1 <= mouse_x <= global_x2) and (440 <= mouse_y <= 538):
-                jugarButton = cambiar_opacidad(jugarButton_original) 
-            else:
-                jugarButton = jugarButton_original
-
-            if (global_x1 <= mouse_x <= global_x2) and (558 <= mouse_y <= 652):
-                historialButton = cambiar_opacidad(historialButton_original)
-            else:
-                historialButton = historialButton_original
-
-            if (global_x1 <= mouse_x <= global_x2) and (672 <= mouse_y <= 768):
-                instrtuccionesButton = cambiar_opacidad(instrtuccionesButton_original)
-            else:
-                instrtuccionesButton = instrtuccionesButton_original
-
-            if (global_x1 <= mouse_x <= global_x2) and (788 <= mouse_y <= 882):
-                creditosButton = cambiar_opacidad(creditosButton_original)
-            else:
-                creditosButton = creditosButton_original
-
             # Detectar clic del mouse
             if event.type == pygame.MOUSEBUTTONDOWN:
-                if (global_x1 <= mouse_x <= global_x2) and (440 <= mouse_y <= 538):
-                    from rollercoster.levels import mostrar_nivel 
+                boton = botones.hit_test(event.pos)
+                if boton is None:
+                    continue
+                if boton.action == "jugar":
                     mostrar_nivel()
-                    return 
-                
-                # Boton historial
-                if (global_x1 <= mouse_x <= global_x2) and (558 <= mouse_y <= 652):
-                    print("Pressed")
-                
-                # Boton instrucciones
-                if (global_x1 <= mouse_x <= global_x2) and (672 <= mouse_y <= 768):
-                    print("Pressed")
-
-                # Boton creditos
-                if (global_x1 <= mouse_x <= global_x2) and (788 <= mouse_y <= 882):
-                    print("Pressed")
+                    return
+                if boton.action == "historial":
+                    from rollercoster.history import mostrar_historial
+                    mostrar_historial()
+                    profiler.begin()
+                    dirty.invalidate()
+                    continue
+
+                # Botones instrucciones y créditos
+                print("Pressed")
+
+        profiler.mark("eventos")
+        cambiados = botones.update(display.mouse_pos(), pygame.mouse.get_pressed()[0])
+        if not cambiados and not dirty.full:
+            if not events and pendientes:
+                nombre = pendientes.pop(0)
+                if nombre == FONDO_NIVELES:
+                    assets.load_image(nombre, alpha=False)
+                else:
+                    assets.load_sprite(nombre)
+            continue
+        for boton in cambiados:
+            dirty.add(boton.dirty_rect)
 
         surface.blit(fondo, (0, 0))
-        surface.blit(jugarButton, (0, 0))
-        surface.blit(historialButton, (0, 0))
-        surface.blit(instrtuccionesButton, (0, 0))
-        surface.blit(creditosButton, (0, 0))
-
-        pygame.display.flip()
+        botones.draw(surface)
+        profiler.mark("dibujo")
+
+        dirty.present()
+        profiler.mark("present")
+        if startup.first_frame_ms is None:
+            startup.first_frame()
+            warmup.start(NIVELES, TRACK_POINTS)
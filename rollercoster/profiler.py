@@ -0,0 +1,165 @@
+# profiler.py
+"""Medición opcional del tiempo de cada cuadro y de sus fases.
+
+Se activa con la variable de entorno ROLLERCOSTER_PROFILE, cuyo valor es el
+archivo donde se guarda la traza al salir (.csv o .json).
+"""
+import atexit
+import csv
+import json
+import time
+from collections import deque
+
+from rollercoster.config import PROFILE_PATH, PROFILE_FRAMES
+
+OVERLAY_REFRESH = 0.5
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+class FrameProfiler:
+    """Registra en un buffer circular la duración de cada fase de los cuadros.
+
+    Uso dentro de un bucle:
+        profiler.frame()          # al comenzar cada cuadro
+        ...
+        profiler.mark("update")   # al terminar cada fase
+    """
+
+    def __init__(self, scene, capacity=PROFILE_FRAMES, enabled=True, overlay=True):
+        self.scene = scene
+        self.enabled = enabled
+        # Sin overlay los cuadros dibujados no dependen de los tiempos medidos
+        self.overlay = overlay
+        self.frames = deque(maxlen=capacity)
+        self._frame_start = None
+        self._last_mark = None
+        self._phases = {}
+        self._overlay = None
+        self._overlay_time = 0.0
+
+    def frame(self):
+        """Cierra el cuadro anterior (si lo hay) y comienza uno nuevo."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._phases["total"] = now - self._frame_start
+            self.frames.append(self._phases)
+        self._frame_start = now
+        self._last_mark = now
+        self._phases = {}
+
+    def begin(self):
+        """Descarta el cuadro en curso al entrar a la escena.
+
+        El perfilador de cada escena se comparte entre visitas: sin esto, el
+        primer frame() cerraría un cuadro que abarca todo el tiempo pasado en
+        otras pantallas.
+        """
+        self._frame_start = None
+        self._last_mark = None
+        self._phases = {}
+
+    def mark(self, phase):
+        """Registra el tiempo transcurrido desde la marca anterior bajo `phase`."""
+        if not self.enabled or self._last_mark is None:
+            return
+        now = time.perf_counter()
+        self._phases[phase] = self._phases.get(phase, 0.0) + now - self._last_mark
+        self._last_mark = now
+
+    def stats(self):
+        """FPS, percentiles del cuadro y promedio por fase, en milisegundos."""
+        if not self.frames:
+            return None
+        totals = [f["total"] for f in self.frames]
+        phases = {}
+        for f in self.frames:
+            for name, value in f.items():
+                if name != "total":
+                    phases[name] = phases.get(name, 0.0) + value
+        mean = sum(totals) / len(totals)
+        return {
+            "fps": 1.0 / mean if mean > 0 else 0.0,
+            "p50": _percentile(totals, 50) * 1000,
+            "p99": _percentile(totals, 99) * 1000,
+            "phases": {name: value / len(self.frames) * 1000 for name, value in phases.items()},
+        }
+
+    def draw_overlay(self, surface, font, color=(255, 255, 0)):
+        """Dibuja las estadísticas en la esquina superior derecha y retorna el rectángulo usado."""
+        if not self.enabled or not self.overlay:
+            return None
+        now = time.perf_counter()
+        if self._overlay is None or now - self._overlay_time >= OVERLAY_REFRESH:
+            self._overlay_time = now
+            self._overlay = self._render_overlay(font, color)
+        if self._overlay is None:
+            return None
+        rect = self._overlay.get_rect(topright=(surface.get_width() - 10, 10))
+        return surface.blit(self._overlay, rect)
+
+    def _render_overlay(self, font, color):
+        import pygame
+        stats = self.stats()
+        if stats is None:
+            return None
+        lines = [f"FPS {stats['fps']:.0f}  p50 {stats['p50']:.1f} ms  p99 {stats['p99']:.1f} ms"]
+        lines += [f"{name}: {value:.2f} ms" for name, value in stats["phases"].items()]
+        renders = [font.render(line, True, color) for line in lines]
+        width = max(r.get_width() for r in renders) + 10
+        height = sum(r.get_height() for r in renders) + 10
+        overlay = pygame.Surface((width, height))
+        overlay.fill((0, 0, 0))
+        y = 5
+        for r in renders:
+            overlay.blit(r, (5, y))
+            y += r.get_height()
+        return overlay
+
+    def rows(self):
+        for i, f in enumerate(self.frames):
+            row = {"scene": self.scene, "frame": i}
+            row.update({name: value * 1000 for name, value in f.items()})
+            yield row
+
+
+# Un perfilador por escena (juego, menú, niveles), compartido entre llamadas
+_profilers = {}
+
+
+def get_profiler(scene):
+    profiler = _profilers.get(scene)
+    if profiler is None:
+        profiler = FrameProfiler(scene, enabled=PROFILE_PATH is not None)
+        _profilers[scene] = profiler
+    return profiler
+
+
+def dump(path=PROFILE_PATH):
+    """Guarda la traza de todas las escenas en CSV o JSON según la extensión."""
+    if path is None:
+        return
+    rows = [row for profiler in _profilers.values() for row in profiler.rows()]
+    if path.endswith(".csv"):
+        columns = ["scene", "frame"]
+        for row in rows:
+            columns += [name for name in row if name not in columns]
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        summary = {scene: p.stats() for scene, p in _profilers.items()}
+        with open(path, "w") as f:
+            json.dump({"summary": summary, "frames": rows}, f, indent=1)
+
+
+if PROFILE_PATH is not None:
+    atexit.register(dump)
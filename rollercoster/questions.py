@@ -0,0 +1,173 @@
+# questions.py
+"""Banco de preguntas guardado en JSON Lines (datos/preguntas.jsonl).
+
+Cada línea es una pregunta con los campos "level", "topic", "question",
+"options" y "answer"; el nivel es la dificultad. El archivo se recorre una
+sola vez para armar un índice de desplazamientos por nivel y tema, que se
+guarda en CACHE_DIR. Después cada pregunta elegida se lee con seek, sin cargar
+el banco completo en memoria.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from rollercoster.config import CACHE_DIR, QUESTIONS_PATH, QUESTIONS_PER_GAME
+
+# Los niveles sin banco propio (por ejemplo, los creados por el usuario) usan el fácil
+NIVEL_POR_DEFECTO = 1
+
+# Preguntas ya leídas del archivo que se conservan en memoria
+QUESTION_CACHE_SIZE = 512
+
+
+class QuestionBank:
+    """Acceso aleatorio a un banco de preguntas en JSON Lines.
+
+    El índice guarda, para cada línea, su desplazamiento en bytes, su nivel y
+    su tema. Los desplazamientos de cada (nivel, tema) se calculan una vez por
+    sesión, así elegir preguntas no depende del tamaño del banco.
+    """
+
+    def __init__(self, path=QUESTIONS_PATH, index_dir=None, cache_size=QUESTION_CACHE_SIZE):
+        self.path = path
+        self.index_dir = index_dir
+        self.cache_size = cache_size
+        self._offsets = None
+        self._levels = None
+        self._topics = None
+        self._topic_names = []
+        self._groups = {}
+        self._questions = OrderedDict()
+        self._lock = threading.RLock()
+
+    def levels(self):
+        """Niveles que tienen al menos una pregunta."""
+        self._ensure_index()
+        return [int(level) for level in np.unique(self._levels)]
+
+    def topics(self):
+        self._ensure_index()
+        return list(self._topic_names)
+
+    def count(self, level, topic=None):
+        return len(self._group(level, topic))
+
+    def sample(self, level, k=QUESTIONS_PER_GAME, rng=random, topic=None):
+        """Retorna `k` preguntas distintas del nivel (y del tema, si se indica)."""
+        offsets = self._group(level, topic)
+        if len(offsets) == 0:
+            offsets = self._group(NIVEL_POR_DEFECTO, None)
+        elegidos = rng.sample(range(len(offsets)), min(k, len(offsets)))
+        return self._read([int(offsets[i]) for i in elegidos])
+
+    def clear(self):
+        with self._lock:
+            self._offsets = None
+            self._groups.clear()
+            self._questions.clear()
+
+    def _group(self, level, topic):
+        key = (level, topic)
+        offsets = self._groups.get(key)
+        if offsets is None:
+            self._ensure_index()
+            mask = self._levels == level
+            if topic is not None:
+                code = self._topic_names.index(topic) if topic in self._topic_names else -1
+                mask &= self._topics == code
+            offsets = self._offsets[mask]
+            self._groups[key] = offsets
+        return offsets
+
+    def _read(self, offsets):
+        with self._lock:
+            faltan = sorted(o for o in offsets if o not in self._questions)
+            if faltan:
+                with open(self.path, "rb") as f:
+                    for offset in faltan:
+                        f.seek(offset)
+                        self._remember(offset, json.loads(f.readline()))
+            questions = []
+            for offset in offsets:
+                self._questions.move_to_end(offset)
+                questions.append(self._questions[offset])
+            return questions
+
+    def _remember(self, offset, question):
+        self._questions[offset] = question
+        while len(self._questions) > self.cache_size:
+            self._questions.popitem(last=False)
+
+    def _ensure_index(self):
+        if self._offsets is not None:
+            return
+        with self._lock:
+            if self._offsets is None:
+                if not self._load_index():
+                    self._build_index()
+                    self._save_index()
+
+    def _build_index(self):
+        """Recorre el archivo línea por línea anotando desplazamiento, nivel y tema."""
+        offsets, levels, topics = [], [], []
+        codes = {}
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    q = json.loads(line)
+                    offsets.append(offset)
+                    levels.append(int(q["level"]))
+                    topics.append(codes.setdefault(q.get("topic", ""), len(codes)))
+                offset += len(line)
+        self._offsets = np.array(offsets, dtype=np.int64)
+        self._levels = np.array(levels, dtype=np.int32)
+        self._topics = np.array(topics, dtype=np.int32)
+        self._topic_names = list(codes)
+
+    def _index_path(self):
+        info = os.stat(self.path)
+        key = (os.path.abspath(self.path), info.st_size, info.st_mtime_ns)
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.index_dir, f"questions-{digest}.npz")
+
+    def _load_index(self):
+        if self.index_dir is None:
+            return False
+        try:
+            with np.load(self._index_path()) as data:
+                self._offsets = data["offsets"]
+                self._levels = data["levels"]
+                self._topics = data["topics"]
+                self._topic_names = [str(name) for name in data["topic_names"]]
+            return True
+        except Exception:
+            # Índice inexistente, dañado o de otra versión del archivo: se rearma
+            self._offsets = None
+            return False
+
+    def _save_index(self):
+        if self.index_dir is None:
+            return
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            path = self._index_path()
+            tmp_path = path + ".tmp.npz"
+            np.savez(tmp_path, offsets=self._offsets, levels=self._levels, topics=self._topics,
+                     topic_names=np.array(self._topic_names, dtype=str))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+question_bank = QuestionBank(index_dir=os.path.join(CACHE_DIR, "questions"))
+
+
+def get_quiz_questions(level, rng=random, topic=None):
+    """Retorna una lista de 5 preguntas aleatorias para el quiz del nivel."""
+    return question_bank.sample(level, QUESTIONS_PER_GAME, rng, topic)
@@ -0,0 +1,230 @@
+# replay.py
+"""Grabación y reproducción determinista de partidas.
+
+El juego lee la entrada a través de una fuente: `LiveInput` (teclado, mouse y
+reloj reales), `InputRecorder` (igual, pero guarda cada cuadro) o
+`ReplayInput` (devuelve los cuadros grabados). Cada cuadro es la duración en
+milisegundos que dio Clock.tick, la posición del mouse y los eventos que usa
+el juego (posiciones en la resolución interna con la que se grabó, que se
+escalan si se reproduce con otra); como el reloj de la partida avanza solo con esas duraciones, la
+reproducción recorre exactamente los mismos estados.
+
+Con ROLLERCOSTER_RECORD=carpeta cada partida se guarda en esa carpeta. Para
+reproducir una, sin límite de velocidad y en una superficie fuera de pantalla:
+
+    python -m rollercoster.replay partida.json --out perfil.json
+    python -m rollercoster.replay partida.json --baseline perfil.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+
+import pygame
+
+from rollercoster import display
+from rollercoster.config import RECORD_DIR, SCREEN_WIDTH, SCREEN_HEIGHT, DESIGN_WIDTH, DESIGN_HEIGHT
+from rollercoster.profiler import FrameProfiler
+
+VERSION = 1
+
+# Campos del estado que entran en la huella de cada cuadro
+_ESTADO = struct.Struct("<ddiiii")
+
+
+def _huella(trace, state):
+    trace.update(_ESTADO.pack(state.progress, state.speed_factor, state.current_question_index,
+                              state.quiz_correct, state.unanswered_count, state.game_over))
+
+
+class LiveInput:
+    """Entrada real: limita los cuadros por segundo y lee la cola de eventos de pygame."""
+
+    replaying = False
+
+    def __init__(self, fps=60):
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.mouse_pos = (0, 0)
+        self.last_ms = 0
+
+    def start(self):
+        """Reinicia el reloj al comenzar la partida: el tiempo leyendo la historia no cuenta como cuadro."""
+        self.clock.tick()
+
+    def next_frame(self):
+        """Retorna (dt en segundos, eventos) del cuadro, o (None, []) si no hay más."""
+        self.last_ms = self.clock.tick(self.fps)
+        self.mouse_pos = display.mouse_pos()
+        return self.last_ms / 1000.0, display.map_events(pygame.event.get())
+
+    def after_update(self, state):
+        pass
+
+    def close(self, state):
+        pass
+
+
+class InputRecorder(LiveInput):
+    """Entrada real que además guarda cada cuadro y la huella del estado."""
+
+    def __init__(self, path, header, fps=60):
+        super().__init__(fps)
+        self.path = path
+        self.header = header
+        self.frames = []
+        self.trace = hashlib.sha1()
+
+    def next_frame(self):
+        dt, events = super().next_frame()
+        self.frames.append([self.last_ms, list(self.mouse_pos), [e for e in map(_serializar, events) if e]])
+        return dt, events
+
+    def after_update(self, state):
+        _huella(self.trace, state)
+
+    def close(self, state):
+        data = dict(self.header, version=VERSION, size=[SCREEN_WIDTH, SCREEN_HEIGHT], frames=self.frames,
+                    result=state.result(), trace=self.trace.hexdigest())
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        except OSError:
+            pass
+
+
+class ReplayInput:
+    """Devuelve los cuadros de una grabación; con `unlimited` no espera entre cuadros."""
+
+    replaying = True
+
+    def __init__(self, recording, unlimited=True, fps=60):
+        self.recording = recording
+        self.unlimited = unlimited
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.mouse_pos = (0, 0)
+        self.trace = hashlib.sha1()
+        self._frames = iter(recording["frames"])
+        self.result = None
+        # Las grabaciones sin tamaño son anteriores a la resolución interna configurable
+        ancho, alto = recording.get("size", (DESIGN_WIDTH, DESIGN_HEIGHT))
+        self._escala = (SCREEN_WIDTH / ancho, SCREEN_HEIGHT / alto)
+
+    def start(self):
+        self.clock.tick()
+
+    def next_frame(self):
+        frame = next(self._frames, None)
+        if frame is None:
+            return None, []
+        if not self.unlimited:
+            self.clock.tick(self.fps)
+        ms, pos, events = frame
+        self.mouse_pos = self._escalar(pos)
+        events = [_deserializar(e) for e in events]
+        if self._escala != (1.0, 1.0):
+            events = [pygame.event.Event(e.type, dict(e.dict, pos=self._escalar(e.pos))) if hasattr(e, "pos") else e
+                      for e in events]
+        return ms / 1000.0, events
+
+    def _escalar(self, pos):
+        return (int(pos[0] * self._escala[0]), int(pos[1] * self._escala[1]))
+
+    def after_update(self, state):
+        _huella(self.trace, state)
+
+    def close(self, state):
+        self.result = state.result()
+
+    @property
+    def deterministic(self):
+        """True si la reproducción pasó por los mismos estados que la grabación."""
+        return self.trace.hexdigest() == self.recording["trace"] and self.result == self.recording["result"]
+
+
+def _serializar(event):
+    if event.type == pygame.QUIT:
+        return ["quit"]
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return ["down", event.pos[0], event.pos[1], event.button]
+    if event.type == pygame.KEYDOWN:
+        return ["key", event.key]
+    return None
+
+
+def _deserializar(data):
+    if data[0] == "quit":
+        return pygame.event.Event(pygame.QUIT)
+    if data[0] == "down":
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(data[1], data[2]), button=data[3])
+    return pygame.event.Event(pygame.KEYDOWN, key=data[1])
+
+
+def input_for_game(header):
+    """Fuente de entrada de una partida nueva: grabadora si RECORD_DIR está definido."""
+    if RECORD_DIR is None:
+        return LiveInput()
+    nombre = time.strftime("partida-%Y%m%d-%H%M%S") + f"-nivel{header['level']}.json"
+    return InputRecorder(os.path.join(RECORD_DIR, nombre), header)
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        recording = json.load(f)
+    if recording.get("version") != VERSION:
+        raise ValueError(f"versión de grabación no soportada: {recording.get('version')}")
+    return recording
+
+
+def replay(recording, unlimited=True, offscreen=True):
+    """Reproduce una grabación y retorna (fuente de entrada, perfilador de cuadros)."""
+    # El juego importa este módulo para elegir su fuente de entrada
+    from rollercoster.game import RollerCoasterGame
+
+    pygame.init()
+    if pygame.display.get_surface() is None:
+        display.set_mode()
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert() if offscreen else None
+    source = ReplayInput(recording, unlimited)
+    game = RollerCoasterGame(recording["func"], recording["xmin"], recording["xmax"], recording["level"],
+                             questions=recording["questions"], input_source=source, screen=screen)
+    game.profiler = FrameProfiler("replay", capacity=len(recording["frames"]) + 1, overlay=False)
+    game.run()
+    return source, game.profiler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproduce una partida grabada y mide el tiempo de cada cuadro.")
+    parser.add_argument("recording", help="archivo .json grabado con ROLLERCOSTER_RECORD")
+    parser.add_argument("--realtime", action="store_true", help="respetar 60 cuadros por segundo")
+    parser.add_argument("--display", action="store_true", help="dibujar en la ventana en lugar de fuera de pantalla")
+    parser.add_argument("--out", help="archivo JSON donde guardar el perfil de cuadros")
+    parser.add_argument("--baseline", help="perfil anterior contra el que comparar p50/p99")
+    args = parser.parse_args(argv)
+
+    if not args.display:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    source, profiler = replay(load(args.recording), unlimited=not args.realtime, offscreen=not args.display)
+    stats = profiler.stats()
+    salida = {"deterministic": source.deterministic, "trace": source.trace.hexdigest(),
+              "result": source.result, "stats": stats, "frames": list(profiler.rows())}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(salida, f, indent=1)
+    print(json.dumps({k: salida[k] for k in ("deterministic", "result", "stats")}, indent=2, ensure_ascii=False))
+    if args.baseline:
+        with open(args.baseline) as f:
+            base = json.load(f)["stats"]
+        for clave in ("p50", "p99"):
+            cambio = (stats[clave] - base[clave]) / base[clave] if base[clave] else 0.0
+            print(f"{clave}: {base[clave]:.2f} ms -> {stats[clave]:.2f} ms ({cambio:+.0%})")
+    return 0 if source.deterministic else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+# scheduler.py
+import pygame
+
+from rollercoster import display
+from rollercoster.config import MENU_FPS, IDLE_TIMEOUT_MS
+
+
+class FrameScheduler:
+    """Controla el ritmo de los bucles de pantallas estáticas (menú, niveles).
+
+    Mientras algo se anima limita los cuadros por segundo con Clock.tick; si no
+    hay nada que animar, bloquea en pygame.event.wait hasta que llegue un evento
+    en lugar de consumir CPU redibujando la misma imagen.
+    """
+
+    def __init__(self, fps=MENU_FPS, idle_timeout=IDLE_TIMEOUT_MS):
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self.clock = pygame.time.Clock()
+
+    @property
+    def dt(self):
+        """Segundos transcurridos en el último cuadro."""
+        return self.clock.get_time() / 1000.0
+
+    def wait_events(self, animating=False):
+        """Retorna los eventos pendientes del cuadro actual (posiciones en la resolución interna)."""
+        if animating:
+            self.clock.tick(self.fps)
+            return display.map_events(pygame.event.get())
+        event = pygame.event.wait(self.idle_timeout)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+        # Evita girar a más del límite cuando llegan ráfagas de movimiento del mouse
+        self.clock.tick(self.fps)
+        return display.map_events(events)
@@ -0,0 +1,148 @@
+# simulate.py
+"""Simulación de partidas sin ventana para ajustar la dificultad de los niveles.
+
+Uso:
+    python -m rollercoster.simulate --sessions 5000 --levels 1 2 3 --policy random
+"""
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from rollercoster.engine import GameState, SimClock
+from rollercoster.questions import question_bank
+
+PASO_SIMULACION = 1 / 60
+MAX_PASOS = 60 * 60 * 10
+
+
+class RandomPolicy:
+    """Jugador aleatorio: tarda entre `min_delay` y `max_delay` segundos en responder.
+
+    Con `accuracy` acierta con esa probabilidad; sin ella elige una opción al azar.
+    Si la demora supera el límite de la pregunta, deja que se agote el tiempo.
+    """
+
+    def __init__(self, accuracy=None, min_delay=0.5, max_delay=6.0):
+        self.accuracy = accuracy
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+    def decide(self, question, rng):
+        delay = rng.uniform(self.min_delay, self.max_delay)
+        if self.accuracy is None:
+            return delay, rng.choice(question["options"])
+        if rng.random() < self.accuracy:
+            return delay, question["answer"]
+        wrong = [opt for opt in question["options"] if opt != question["answer"]]
+        return delay, rng.choice(wrong)
+
+
+class ScriptedPolicy:
+    """Jugador guionado: lista de (demora, acierta) repetida en cada pregunta."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self._turn = 0
+
+    def decide(self, question, rng):
+        delay, correct = self.script[self._turn % len(self.script)]
+        self._turn += 1
+        if correct:
+            return delay, question["answer"]
+        wrong = [opt for opt in question["options"] if opt != question["answer"]]
+        return delay, wrong[0]
+
+
+POLICIES = {
+    "random": lambda: RandomPolicy(),
+    "good": lambda: RandomPolicy(accuracy=0.8, max_delay=4.0),
+    "bad": lambda: RandomPolicy(accuracy=0.3),
+}
+
+
+def simulate_session(level, policy, seed, dt=PASO_SIMULACION):
+    """Juega una partida completa con un reloj simulado y retorna su resultado."""
+    rng = random.Random(seed)
+    clock = SimClock()
+    state = GameState(level, clock=clock, rng=rng)
+    pending = None
+    pending_index = -1
+    for _ in range(MAX_PASOS):
+        if state.game_over:
+            break
+        question = state.current_question()
+        if question is not None and pending_index != state.current_question_index:
+            pending_index = state.current_question_index
+            delay, option = policy.decide(question, rng)
+            pending = (state.question_start_time + delay, option)
+        clock.advance(dt)
+        if question is not None and pending is not None and clock() >= pending[0]:
+            state.process_answer(pending[1])
+            pending = None
+        state.update(dt)
+    return state.result()
+
+
+def _run_chunk(args):
+    level, policy_name, seeds = args
+    return [simulate_session(level, POLICIES[policy_name](), seed) for seed in seeds]
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(q / 100 * (len(values) - 1)))))
+    return values[index]
+
+
+def summarize(results):
+    """Distribución de resultados de un conjunto de partidas del mismo nivel."""
+    n = len(results)
+    correct_counts = {}
+    for r in results:
+        correct_counts[r["correct"]] = correct_counts.get(r["correct"], 0) + 1
+    finish_times = [r["time"] for r in results if r["completed"]]
+    return {
+        "sessions": n,
+        "completion_rate": sum(r["completed"] for r in results) / n if n else 0.0,
+        "success_rate": sum(r["success"] for r in results) / n if n else 0.0,
+        "mean_correct": sum(r["correct"] for r in results) / n if n else 0.0,
+        "correct_distribution": dict(sorted(correct_counts.items())),
+        "finish_time_p50": _percentile(finish_times, 50),
+        "finish_time_p90": _percentile(finish_times, 90),
+    }
+
+
+def run_batch(levels, sessions, policy="random", workers=None, seed=0, chunk_size=250):
+    """Simula `sessions` partidas por nivel repartidas en un pool de procesos."""
+    tasks = []
+    for level in levels:
+        seeds = [seed * 1_000_003 + level * 10_000_019 + i for i in range(sessions)]
+        for start in range(0, sessions, chunk_size):
+            tasks.append((level, policy, seeds[start:start + chunk_size]))
+
+    results = {level: [] for level in levels}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (level, _, _), chunk in zip(tasks, pool.map(_run_chunk, tasks)):
+            results[level].extend(chunk)
+    return {level: summarize(results[level]) for level in levels}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simula partidas sin ventana y resume los resultados por nivel.")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--levels", type=int, nargs="+", default=question_bank.levels())
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.levels, args.sessions, args.policy, args.workers, args.seed)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
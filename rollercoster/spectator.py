@@ -0,0 +1,437 @@
+# spectator.py
+"""Vista de espectador: los carritos de toda la clase sobre las pistas de sus niveles.
+
+Cada juego con ROLLERCOSTER_SPECTATOR=host:puerto envía por UDP su avance
+varias veces por segundo. La vista los recibe (o lee un archivo JSON Lines, o
+usa una clase simulada con --demo) y dibuja todos los carritos juntos:
+
+    python -m rollercoster.spectator --udp 5005
+    python -m rollercoster.spectator --demo 300 --levels 3 4
+
+El estado de los carritos vive en arreglos de NumPy; las posiciones en
+pantalla se calculan para todos en una sola operación y los carritos se
+dibujan con un único Surface.blits.
+"""
+import argparse
+import getpass
+import json
+import math
+import os
+import random
+import socket
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from rollercoster.config import (TRACK_MARGIN, TRACK_POINTS, TRACK_SIMPLIFY_TOLERANCE,
+                                 COLOR_TRACK, COLOR_TEXT, COLOR_TIMER, SPECTATOR_ADDRESS, SPECTATOR_PORT,
+                                 SPECTATOR_INTERVAL, SPECTATOR_STALE, px)
+from rollercoster import display
+from rollercoster.drawing import draw_vertical_gradient, simplify_polyline
+from rollercoster.engine import TIEMPO_POR_PREGUNTA
+from rollercoster.profiler import get_profiler
+from rollercoster.text_cache import text_cache, get_font
+from rollercoster.track_cache import get_track
+
+# Medidas en píxeles de la resolución interna
+PANEL_WIDTH = px(260)
+CAR_RADIUS = max(3, px(7))
+LEADERBOARD_ROWS = 20
+# Segundos que se sigue moviendo un carrito con su última velocidad si no llegan datos
+MAX_EXTRAPOLATION = 1.0
+
+PALETA = [(220, 20, 60), (30, 144, 255), (50, 205, 50), (255, 140, 0), (186, 85, 211), (0, 206, 209),
+          (255, 215, 0), (255, 105, 180), (139, 69, 19), (127, 255, 212), (245, 245, 245), (112, 128, 144)]
+
+
+class CarFleet:
+    """Estado de los carritos en arreglos de NumPy, un lugar por carrito.
+
+    Cada actualización guarda el último avance informado y estima la velocidad;
+    entre actualizaciones el avance mostrado se extrapola con esa velocidad.
+    """
+
+    def __init__(self, capacity=64):
+        self.ids = []
+        self.names = []
+        self._slots = {}
+        self.track = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.int32)
+        self.reported = np.zeros(capacity)
+        self.velocity = np.zeros(capacity)
+        self.last_seen = np.zeros(capacity)
+        self.correct = np.zeros(capacity, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def update(self, car_id, track, progress, now, name=None, correct=0):
+        slot = self._slots.get(car_id)
+        if slot is None:
+            slot = self._add(car_id, name or str(car_id))
+            self.velocity[slot] = 0.0
+        else:
+            dt = now - self.last_seen[slot]
+            avance = progress - self.reported[slot]
+            self.velocity[slot] = avance / dt if dt > 0 and avance >= 0 else 0.0
+        self.track[slot] = track
+        self.reported[slot] = progress
+        self.last_seen[slot] = now
+        self.correct[slot] = correct
+
+    def progress(self, now):
+        """Avance mostrado de todos los carritos (0 a 1)."""
+        n = len(self)
+        dt = np.minimum(now - self.last_seen[:n], MAX_EXTRAPOLATION)
+        return np.clip(self.reported[:n] + self.velocity[:n] * dt, 0.0, 1.0)
+
+    def remove_stale(self, now, stale=SPECTATOR_STALE):
+        """Quita los carritos que no enviaron datos en los últimos `stale` segundos."""
+        n = len(self)
+        keep = np.flatnonzero(now - self.last_seen[:n] <= stale)
+        if len(keep) == n:
+            return
+        for name in ("track", "color", "reported", "velocity", "last_seen", "correct"):
+            arreglo = getattr(self, name)
+            arreglo[:len(keep)] = arreglo[keep]
+        self.ids = [self.ids[i] for i in keep]
+        self.names = [self.names[i] for i in keep]
+        self._slots = {car_id: i for i, car_id in enumerate(self.ids)}
+
+    def _add(self, car_id, name):
+        slot = len(self.ids)
+        if slot == len(self.track):
+            for attr in ("track", "color", "reported", "velocity", "last_seen", "correct"):
+                arreglo = getattr(self, attr)
+                setattr(self, attr, np.concatenate((arreglo, np.zeros_like(arreglo))))
+        self.ids.append(car_id)
+        self.names.append(name)
+        self._slots[car_id] = slot
+        self.color[slot] = slot % len(PALETA)
+        return slot
+
+
+class SpectatorView:
+    """Dibuja una franja por pista, los carritos y la tabla de posiciones."""
+
+    def __init__(self, levels, screen, niveles=None):
+        if niveles is None:
+            from rollercoster.levels import NIVELES as niveles
+        self.screen = screen
+        self.levels = list(levels)
+        self.lane_of_level = {level: i for i, level in enumerate(self.levels)}
+        self.font = get_font("Arial", px(20))
+        self.title_font = get_font("Arial", px(26))
+
+        ancho = screen.get_width() - PANEL_WIDTH
+        alto = screen.get_height() // len(self.levels)
+        self.tracks = []
+        self.lanes = []
+        for i, level in enumerate(self.levels):
+            valores = niveles[level - 1][2]
+            self.tracks.append(get_track(valores['func'], float(valores['xmin']), float(valores['xmax']),
+                                         TRACK_POINTS))
+            self.lanes.append(pygame.Rect(0, i * alto, ancho, alto))
+
+        # Transformación mundo -> pantalla de cada franja: x = x0 + (wx - xmin) * sx, y = y0 - (wy - ymin) * sy
+        self._x0 = np.array([lane.x + TRACK_MARGIN for lane in self.lanes], dtype=float)
+        self._y0 = np.array([lane.bottom - TRACK_MARGIN for lane in self.lanes], dtype=float)
+        self._xmin = np.array([t.xmin for t in self.tracks], dtype=float)
+        self._ymin = np.array([t.min_y for t in self.tracks], dtype=float)
+        self._sx = np.array([(lane.width - 2 * TRACK_MARGIN) / ((t.xmax - t.xmin) or 1.0)
+                             for lane, t in zip(self.lanes, self.tracks)])
+        self._sy = np.array([(lane.height - 2 * TRACK_MARGIN) / ((t.max_y - t.min_y) or 1.0)
+                             for lane, t in zip(self.lanes, self.tracks)])
+
+        self.background = self._build_background()
+        self.sprites = [self._car_sprite(color) for color in PALETA]
+
+    def lane_for(self, level):
+        """Franja del nivel, o None si la vista no muestra ese nivel."""
+        return self.lane_of_level.get(level)
+
+    def to_screen(self, lanes, world):
+        """Convierte puntos (N, 2) del mundo a la pantalla según la franja de cada uno."""
+        x = self._x0[lanes] + (world[:, 0] - self._xmin[lanes]) * self._sx[lanes]
+        y = self._y0[lanes] - (world[:, 1] - self._ymin[lanes]) * self._sy[lanes]
+        return np.column_stack((x, y))
+
+    def car_positions(self, fleet, now):
+        """Esquina superior izquierda del sprite de cada carrito, como arreglo (N, 2) de enteros."""
+        n = len(fleet)
+        lanes = fleet.track[:n]
+        progress = fleet.progress(now)
+        world = np.empty((n, 2))
+        for i, track in enumerate(self.tracks):
+            mask = lanes == i
+            if mask.any():
+                world[mask] = track.position_at(progress[mask] * track.length)
+        return (self.to_screen(lanes, world) - CAR_RADIUS).astype(int), progress
+
+    def draw(self, fleet, now):
+        self.screen.blit(self.background, (0, 0))
+        if len(fleet):
+            positions, progress = self.car_positions(fleet, now)
+            sprites = [self.sprites[c] for c in fleet.color[:len(fleet)].tolist()]
+            self.screen.blits(list(zip(sprites, positions.tolist())), doreturn=False)
+            self.draw_leaderboard(fleet, progress)
+
+    def draw_leaderboard(self, fleet, progress):
+        x = self.screen.get_width() - PANEL_WIDTH + px(15)
+        y = px(70)
+        orden = np.lexsort((-fleet.correct[:len(fleet)], -progress))[:LEADERBOARD_ROWS]
+        for rank, slot in enumerate(orden.tolist(), start=1):
+            pygame.draw.circle(self.screen, PALETA[fleet.color[slot]], (x + px(6), y + px(12)), max(2, px(6)))
+            nombre = text_cache.render(self.font, f"{rank}. {fleet.names[slot][:14]}", COLOR_TEXT)
+            self.screen.blit(nombre, (x + px(20), y))
+            avance = text_cache.render(self.font, f"{int(progress[slot] * 100)}%", COLOR_TIMER)
+            self.screen.blit(avance, (x + PANEL_WIDTH - px(30) - avance.get_width(), y))
+            y += px(28)
+
+    def _build_background(self):
+        background = pygame.Surface(self.screen.get_size()).convert()
+        for i, (lane, track, level) in enumerate(zip(self.lanes, self.tracks, self.levels)):
+            draw_vertical_gradient(background.subsurface(lane), (135, 206, 250), (25, 25, 112))
+            lanes = np.full(len(track), i)
+            puntos = simplify_polyline(self.to_screen(lanes, track.points), TRACK_SIMPLIFY_TOLERANCE)
+            pygame.draw.lines(background, COLOR_TRACK, False, puntos.round().astype(int).tolist(), max(1, px(3)))
+            etiqueta = self.font.render(f"Nivel {level}", True, COLOR_TEXT)
+            background.blit(etiqueta, (lane.x + px(10), lane.y + px(8)))
+            pygame.draw.line(background, (0, 0, 0), lane.bottomleft, lane.bottomright, max(1, px(2)))
+        panel = pygame.Rect(self.screen.get_width() - PANEL_WIDTH, 0, PANEL_WIDTH, self.screen.get_height())
+        draw_vertical_gradient(background.subsurface(panel), (40, 40, 40), (10, 10, 10))
+        titulo = self.title_font.render("Posiciones", True, COLOR_TEXT)
+        background.blit(titulo, (panel.x + px(15), px(20)))
+        return background
+
+    @staticmethod
+    def _car_sprite(color):
+        sprite = pygame.Surface((2 * CAR_RADIUS, 2 * CAR_RADIUS), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (0, 0, 0), (CAR_RADIUS, CAR_RADIUS), CAR_RADIUS)
+        pygame.draw.circle(sprite, color, (CAR_RADIUS, CAR_RADIUS), CAR_RADIUS - 2)
+        return sprite.convert_alpha()
+
+
+# --- Fuentes de datos: cada una retorna en poll() la lista de actualizaciones nuevas ---
+
+# Respuestas correctas máximas que se aceptan en una actualización
+MAX_CORRECT = 1000
+
+
+def _numero(valor):
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        return False
+    try:
+        return math.isfinite(valor)
+    except OverflowError:
+        return False
+
+
+def _validar(m):
+    """Actualización con los tipos esperados, o None si no sirve (los datos llegan sin autenticar)."""
+    if not isinstance(m, dict):
+        return None
+    car_id, progress = m.get("id"), m.get("progress")
+    level, name, correct = m.get("level"), m.get("name"), m.get("correct", 0)
+    if isinstance(car_id, bool) or not isinstance(car_id, (int, str)) or not _numero(progress):
+        return None
+    if not isinstance(level, int) or isinstance(level, bool):
+        return None
+    if name is not None and not isinstance(name, str):
+        name = None
+    if not _numero(correct):
+        correct = 0
+    return {"id": car_id, "level": level, "progress": min(max(float(progress), 0.0), 1.0),
+            "name": name[:40] if name else None, "correct": min(max(0, int(correct)), MAX_CORRECT)}
+
+
+def _decode(data):
+    """Una actualización es un objeto {"id", "level", "progress", "name", "correct"} o una lista de ellos.
+
+    Los mensajes mal formados o con tipos inesperados se descartan.
+    """
+    try:
+        mensaje = json.loads(data)
+    except (ValueError, UnicodeDecodeError, RecursionError):
+        return []
+    mensajes = mensaje if isinstance(mensaje, list) else [mensaje]
+    return [u for u in map(_validar, mensajes) if u is not None]
+
+
+class UdpFeed:
+    """Recibe actualizaciones por UDP sin bloquear el bucle de dibujo."""
+
+    def __init__(self, port=SPECTATOR_PORT, host="0.0.0.0"):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+
+    def poll(self):
+        updates = []
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(65536)
+            except (BlockingIOError, InterruptedError):
+                return updates
+            updates.extend(_decode(data))
+
+    def close(self):
+        self.sock.close()
+
+
+class FileFeed:
+    """Lee las líneas nuevas de un archivo JSON Lines (por ejemplo, de otro programa)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self._resto = b""
+
+    def poll(self):
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < self.offset:
+                    # El archivo se truncó: se vuelve a leer desde el principio
+                    self.offset, self._resto = 0, b""
+                f.seek(self.offset)
+                data = self._resto + f.read()
+                self.offset = f.tell()
+        except OSError:
+            return []
+        *lineas, self._resto = data.split(b"\n")
+        return [u for linea in lineas if linea.strip() for u in _decode(linea)]
+
+    def close(self):
+        pass
+
+
+class DemoFeed:
+    """Clase simulada para probar la vista sin alumnos: `cars` carritos con ritmos distintos."""
+
+    def __init__(self, cars, levels, seed=0, interval=SPECTATOR_INTERVAL):
+        rng = random.Random(seed)
+        self.rng = rng
+        self.interval = interval
+        self.cars = [{"id": f"demo-{i}", "name": f"Alumno {i + 1}", "level": rng.choice(levels),
+                      "progress": 0.0, "speed": rng.uniform(0.01, 0.05), "correct": 0} for i in range(cars)]
+        self._last = None
+
+    def poll(self):
+        now = time.monotonic()
+        if self._last is not None and now - self._last < self.interval:
+            return []
+        dt = 0.0 if self._last is None else now - self._last
+        self._last = now
+        for car in self.cars:
+            if self.rng.random() < dt / TIEMPO_POR_PREGUNTA:
+                # Respuesta (en promedio una por pregunta): cambia el ritmo como en el juego
+                correcta = self.rng.random() < 0.6
+                car["correct"] += correcta
+                car["speed"] = min(0.25, max(0.025, car["speed"] + (0.025 if correcta else -0.025)))
+            car["progress"] = min(1.0, car["progress"] + car["speed"] * dt)
+        return [{k: car[k] for k in ("id", "name", "level", "progress", "correct")} for car in self.cars]
+
+    def close(self):
+        pass
+
+
+class SpectatorPublisher:
+    """Envía el avance de una partida a la vista de espectador, como mucho cada `interval` segundos."""
+
+    def __init__(self, address, level, name=None, interval=SPECTATOR_INTERVAL):
+        host, _, port = address.rpartition(":")
+        self.address = (host or "127.0.0.1", int(port or SPECTATOR_PORT))
+        self.interval = interval
+        self.message = {"id": f"{socket.gethostname()}-{os.getpid()}-{random.getrandbits(16)}",
+                        "name": name or getpass.getuser(), "level": level}
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self._last = None
+
+    def publish(self, state, force=False):
+        now = state.clock()
+        if not force and self._last is not None and now - self._last < self.interval:
+            return
+        self._last = now
+        self.message.update(progress=round(state.progress, 4), correct=state.quiz_correct)
+        try:
+            self.sock.sendto(json.dumps(self.message).encode("utf-8"), self.address)
+        except OSError:
+            # Sin red o sin espectador escuchando: la partida sigue igual
+            pass
+
+
+def publisher_for_game(level):
+    """Publicador de la partida si ROLLERCOSTER_SPECTATOR está definido, o None."""
+    if SPECTATOR_ADDRESS is None:
+        return None
+    return SpectatorPublisher(SPECTATOR_ADDRESS, level, os.environ.get("ROLLERCOSTER_NAME"))
+
+
+def run(feed, levels, fps=60, duration=None):
+    """Bucle de la vista: recibe actualizaciones y redibuja hasta cerrar la ventana."""
+    pygame.init()
+    screen = display.get_surface() or display.set_mode()
+    pygame.display.set_caption("Roller Coaster Adventure: Espectador")
+    view = SpectatorView(levels, screen)
+    fleet = CarFleet()
+    clock = pygame.time.Clock()
+    profiler = get_profiler("espectador")
+    profiler.begin()
+    inicio = time.monotonic()
+    ultima_limpieza = inicio
+    while duration is None or time.monotonic() - inicio < duration:
+        clock.tick(fps)
+        profiler.frame()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return fleet
+        now = time.monotonic()
+        for u in feed.poll():
+            lane = view.lane_for(u["level"])
+            # Carritos de niveles que la vista no muestra
+            if lane is None:
+                continue
+            fleet.update(u["id"], lane, u["progress"], now, u["name"], u["correct"])
+        if now - ultima_limpieza > 1.0:
+            fleet.remove_stale(now)
+            ultima_limpieza = now
+        profiler.mark("datos")
+        view.draw(fleet, now)
+        profiler.mark("dibujo")
+        profiler.draw_overlay(screen, view.font)
+        display.flip()
+        profiler.mark("present")
+    return fleet
+
+
+def main(argv=None):
+    from rollercoster.levels import NIVELES
+    parser = argparse.ArgumentParser(description="Vista de espectador con los carritos de toda la clase.")
+    fuente = parser.add_mutually_exclusive_group()
+    fuente.add_argument("--udp", type=int, metavar="PUERTO", help=f"escuchar por UDP (por defecto {SPECTATOR_PORT})")
+    fuente.add_argument("--file", metavar="ARCHIVO", help="leer actualizaciones de un archivo JSON Lines")
+    fuente.add_argument("--demo", type=int, metavar="CARRITOS", help="simular una clase con esta cantidad de carritos")
+    parser.add_argument("--levels", type=int, nargs="+", choices=range(1, len(NIVELES) + 1),
+                        default=list(range(1, len(NIVELES) + 1)), metavar="NIVEL")
+    parser.add_argument("--seconds", type=float, help="cerrar después de estos segundos")
+    args = parser.parse_args(argv)
+
+    if args.demo:
+        feed = DemoFeed(args.demo, args.levels)
+    elif args.file:
+        feed = FileFeed(args.file)
+    else:
+        feed = UdpFeed(args.udp or SPECTATOR_PORT)
+    try:
+        run(feed, args.levels, duration=args.seconds)
+    finally:
+        feed.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
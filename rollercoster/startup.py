@@ -0,0 +1,23 @@
+# startup.py
+"""Medición del tiempo de arranque hasta el primer cuadro del menú.
+
+Con ROLLERCOSTER_STARTUP=1 se imprime el tiempo al mostrarse el menú.
+"""
+import os
+import sys
+import time
+
+# Momento en que se importó este módulo (main.py lo importa primero)
+T0 = time.perf_counter()
+
+first_frame_ms = None
+
+
+def first_frame():
+    """Registra el primer cuadro del menú; solo cuenta la primera llamada."""
+    global first_frame_ms
+    if first_frame_ms is not None:
+        return
+    first_frame_ms = (time.perf_counter() - T0) * 1000
+    if os.environ.get("ROLLERCOSTER_STARTUP"):
+        print(f"Primer cuadro del menú: {first_frame_ms:.0f} ms", file=sys.stderr)
@@ -0,0 +1,291 @@
+# telemetry.py
+"""Registro de las partidas jugadas en un archivo binario de solo agregado.
+
+Cada partida deja un registro de inicio, uno por pregunta (respuesta elegida,
+latencia y velocidad antes y después) y uno con el resultado final. Los
+registros se acumulan en memoria y un hilo escritor los empaqueta y los agrega
+al archivo en lotes, así el bucle de dibujo nunca espera al disco. El mismo
+hilo mantiene un resumen por nivel (summary.json) que es lo que lee la pantalla
+de historial, y compacta el archivo cuando crece demasiado. Varias instancias
+del juego pueden compartir la carpeta: cada escritura toma un bloqueo de
+archivo y vuelve a leer el resumen del disco antes de actualizarlo.
+"""
+import atexit
+import json
+import os
+import random
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+from rollercoster.config import (TELEMETRY_ENABLED, TELEMETRY_DIR, TELEMETRY_FLUSH_INTERVAL,
+                                 TELEMETRY_FLUSH_RECORDS, TELEMETRY_MAX_BYTES, TELEMETRY_KEEP_SESSIONS)
+
+MAGIC = b"RCT1"
+
+# Tipos de registro: cabecera (tipo, sesión) seguida de los campos de cada tipo
+INICIO = 1
+RESPUESTA = 2
+FIN = 3
+
+CABECERA = struct.Struct("<BI")
+CAMPOS = {
+    # nivel, hora de inicio (epoch)
+    INICIO: struct.Struct("<bd"),
+    # pregunta, opción elegida (-1 si se agotó el tiempo), latencia, velocidad antes y después, marcas
+    RESPUESTA: struct.Struct("<Bbfffb"),
+    # completada, éxito, correctas, sin responder, preguntas, tiempo total
+    FIN: struct.Struct("<BBBBBf"),
+}
+
+# Marcas de las respuestas
+CORRECTA = 1
+GENERADA = 2
+
+# Partidas recientes que guarda el resumen
+RECIENTES = 10
+
+
+def read_records(path):
+    """Recorre el archivo y retorna la lista de (tipo, sesión, campos)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        return []
+    records = []
+    offset = len(MAGIC)
+    while offset + CABECERA.size <= len(data):
+        tipo, session = CABECERA.unpack_from(data, offset)
+        campos = CAMPOS.get(tipo)
+        if campos is None or offset + CABECERA.size + campos.size > len(data):
+            # Registro desconocido o cortado por un cierre abrupto: se descarta el resto
+            break
+        records.append((tipo, session, campos.unpack_from(data, offset + CABECERA.size)))
+        offset += CABECERA.size + campos.size
+    return records
+
+
+def _pack(tipo, session, campos):
+    return CABECERA.pack(tipo, session) + CAMPOS[tipo].pack(*campos)
+
+
+def _empty_summary():
+    return {"version": 1, "levels": {}, "recent": []}
+
+
+@contextmanager
+def _file_lock(path):
+    """Bloqueo exclusivo entre procesos sobre el archivo `path`."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class TelemetryLog:
+    """Buffer en memoria de registros y su escritura en lotes desde otro hilo."""
+
+    def __init__(self, directory=TELEMETRY_DIR, enabled=TELEMETRY_ENABLED,
+                 flush_interval=TELEMETRY_FLUSH_INTERVAL, flush_records=TELEMETRY_FLUSH_RECORDS,
+                 max_bytes=TELEMETRY_MAX_BYTES, keep_sessions=TELEMETRY_KEEP_SESSIONS):
+        self.directory = directory
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        self.max_bytes = max_bytes
+        self.keep_sessions = keep_sessions
+        self.log_path = os.path.join(directory, "sessions.bin")
+        self.summary_path = os.path.join(directory, "summary.json")
+        self.lock_path = os.path.join(directory, "telemetry.lock")
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        # Solo un hilo a la vez escribe el archivo y el resumen (entre procesos, con _file_lock)
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._open_sessions = {}
+
+    def record(self, tipo, session, *campos):
+        """Agrega un registro al buffer; no toca el disco."""
+        if not self.enabled:
+            return
+        with self._buffer_lock:
+            self._buffer.append((tipo, session, campos))
+            lleno = len(self._buffer) >= self.flush_records
+        if self._thread is None:
+            self._start()
+        if lleno:
+            self._wake.set()
+
+    def flush(self):
+        """Escribe lo pendiente desde el hilo actual (al salir o antes de leer el resumen)."""
+        if not self.enabled:
+            return
+        with self._io_lock:
+            try:
+                self._write_pending()
+            except OSError:
+                # Sin disco disponible: la partida sigue igual aunque no quede registrada
+                pass
+
+    def close(self):
+        self.flush()
+
+    def summary(self):
+        """Resumen por nivel y últimas partidas, sin recorrer el archivo de registros."""
+        self.flush()
+        if not os.path.exists(self.summary_path):
+            return _empty_summary()
+        with self._io_lock:
+            try:
+                with _file_lock(self.lock_path):
+                    return self._load_summary()
+            except OSError:
+                return _empty_summary()
+
+    def _start(self):
+        with self._buffer_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _write_pending(self):
+        with self._buffer_lock:
+            pendientes, self._buffer = self._buffer, []
+        if not pendientes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        datos = b"".join(_pack(*r) for r in pendientes)
+        with _file_lock(self.lock_path):
+            with open(self.log_path, "ab") as f:
+                if f.tell() == 0:
+                    f.write(MAGIC)
+                f.write(datos)
+                size = f.tell()
+            # El resumen se relee bajo el bloqueo: otra instancia pudo actualizarlo
+            summary = self._load_summary()
+            if self._update_summary(summary, pendientes):
+                self._save_summary(summary)
+            if size > self.max_bytes:
+                self._compact()
+
+    def _load_summary(self):
+        try:
+            with open(self.summary_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return _empty_summary()
+
+    def _save_summary(self, summary):
+        tmp_path = self.summary_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False)
+        os.replace(tmp_path, self.summary_path)
+
+    def _update_summary(self, summary, records):
+        """Acumula los registros en `summary`; retorna True si terminó alguna partida."""
+        terminada = False
+        for tipo, session, campos in records:
+            if tipo == INICIO:
+                self._open_sessions[session] = {"level": campos[0], "date": campos[1],
+                                                "answered": 0, "latency": 0.0}
+                continue
+            abierta = self._open_sessions.get(session)
+            if abierta is None:
+                continue
+            if tipo == RESPUESTA and campos[1] >= 0:
+                abierta["answered"] += 1
+                abierta["latency"] += campos[2]
+            elif tipo == FIN:
+                del self._open_sessions[session]
+                terminada = True
+                completed, success, correct, unanswered, questions, total = campos
+                nivel = summary["levels"].setdefault(str(abierta["level"]), {
+                    "sessions": 0, "completed": 0, "success": 0, "correct": 0, "questions": 0,
+                    "answered": 0, "latency": 0.0, "best_time": None})
+                nivel["sessions"] += 1
+                nivel["completed"] += completed
+                nivel["success"] += success
+                nivel["correct"] += correct
+                nivel["questions"] += questions
+                nivel["answered"] += abierta["answered"]
+                nivel["latency"] += abierta["latency"]
+                if success and (nivel["best_time"] is None or total < nivel["best_time"]):
+                    nivel["best_time"] = total
+                summary["recent"].insert(0, {"level": abierta["level"], "date": abierta["date"],
+                                             "success": bool(success), "correct": correct,
+                                             "questions": questions, "time": total})
+                del summary["recent"][RECIENTES:]
+        return terminada
+
+    def _compact(self):
+        """Reescribe el archivo conservando solo las últimas `keep_sessions` partidas.
+
+        Los totales de las partidas descartadas ya están en el resumen. Se llama
+        con el bloqueo tomado, así ninguna otra instancia agrega registros mientras tanto.
+        """
+        records = read_records(self.log_path)
+        sesiones = [session for tipo, session, _ in records if tipo == INICIO]
+        conservar = set(sesiones[-self.keep_sessions:])
+        tmp_path = self.log_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(b"".join(_pack(*r) for r in records if r[1] in conservar))
+        os.replace(tmp_path, self.log_path)
+
+
+class SessionRecorder:
+    """Registra los eventos de una partida en el log compartido."""
+
+    def __init__(self, log, level):
+        self.log = log
+        self.id = random.getrandbits(32)
+        log.record(INICIO, self.id, level, time.time())
+
+    def answer(self, index, option, latency, correct, speed_before, speed_after, generated=False):
+        """`option` es el índice de la opción elegida, o -1 si se agotó el tiempo."""
+        marcas = (CORRECTA if correct else 0) | (GENERADA if generated else 0)
+        self.log.record(RESPUESTA, self.id, index, option, latency, speed_before, speed_after, marcas)
+
+    def timeout(self, index, latency, speed_before, speed_after, generated=False):
+        self.answer(index, -1, latency, False, speed_before, speed_after, generated)
+
+    def finish(self, result):
+        self.log.record(FIN, self.id, result["completed"], result["success"], result["correct"],
+                        result["unanswered"], result["questions"], result["time"])
+
+
+telemetry_log = TelemetryLog()
+atexit.register(telemetry_log.close)
+
+
+# Las reproducciones de partidas grabadas no se registran
+_disabled_log = TelemetryLog(enabled=False)
+
+
+def start_session(level, enabled=True):
+    return SessionRecorder(telemetry_log if enabled else _disabled_log, level)
@@ -0,0 +1,73 @@
+# text_cache.py
+from collections import OrderedDict
+
+import pygame
+
+TEXT_CACHE_SIZE = 256
+
+# Fuentes ya creadas por (nombre, tamaño): el caché de textos se indexa por el
+# objeto Font, así que todas las pantallas y partidas deben compartir las mismas
+_fonts = {}
+
+
+def get_font(name, size):
+    """Fuente del sistema `name` de `size` píxeles, creada una sola vez."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    """Caché LRU de textos renderizados, indexado por (fuente, texto, color, antialias)."""
+
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        while len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+class TextLabel:
+    """Texto con formato que solo se vuelve a renderizar cuando cambia su valor."""
+
+    def __init__(self, font, template, color, cache=None):
+        self.font = font
+        self.template = template
+        self.color = color
+        self.cache = cache
+        self._values = None
+        self._surface = None
+
+    def render(self, *values):
+        if values != self._values or self._surface is None:
+            text = self.template.format(*values)
+            if self.cache is not None:
+                self._surface = self.cache.render(self.font, text, self.color)
+            else:
+                self._surface = self.font.render(text, True, self.color)
+            self._values = values
+        return self._surface
+
+
+# Caché compartido por todas las partidas
+text_cache = TextCache()
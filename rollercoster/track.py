@@ -0,0 +1,203 @@
+# track.py
+import time
+
+import numpy as np
+
+from rollercoster.config import SCREEN_WIDTH, ANIM_HEIGHT, TRACK_MARGIN
+from rollercoster.expressions import (ExpressionError, EVAL_TIME_LIMIT, parse_expression, evaluate_pointwise,
+                                      sanitize_samples)
+
+FUNCION_POR_DEFECTO = "10 - x**2"
+
+# Tamaño de la tabla de posiciones equiespaciadas por longitud de arco
+UNIFORM_SAMPLES = 4096
+
+# Muestreo adaptativo: muestras iniciales, rondas de refinamiento y error máximo en píxeles
+ADAPTIVE_INITIAL = 129
+ADAPTIVE_MAX_DEPTH = 12
+ADAPTIVE_TOLERANCE = 0.25
+ADAPTIVE_MIN_STEP_PX = 0.05
+# Muestras equiespaciadas con las que se mide el rango típico de una pista adaptativa
+CLIP_REFERENCE_SAMPLES = 1024
+
+
+class Track:
+    """Pista muestreada: arreglos contiguos de coordenadas x/y."""
+
+    def __init__(self, func_str, xmin, xmax, xs, ys, arc_length=None, adaptive=False):
+        self.func_str = func_str
+        self.adaptive = adaptive
+        self.xmin = xmin
+        self.xmax = xmax
+        self.xs = xs
+        self.ys = ys
+        self.min_y = float(ys.min())
+        self.max_y = float(ys.max())
+        if arc_length is None:
+            arc_length = self._compute_arc_length()
+        self.arc_length = arc_length
+        self._uniform = None
+        # Informe de interpretación y evaluación (solo en pistas recién compiladas)
+        self.report = None
+
+    def _compute_arc_length(self):
+        """Longitud acumulada de la pista medida en píxeles de pantalla."""
+        span_x = (self.xmax - self.xmin) or 1.0
+        span_y = (self.max_y - self.min_y) or 1.0
+        sx = (self.xs - self.xmin) / span_x * (SCREEN_WIDTH - 2 * TRACK_MARGIN)
+        sy = (self.ys - self.min_y) / span_y * (ANIM_HEIGHT - 2 * TRACK_MARGIN)
+        segmentos = np.hypot(np.diff(sx), np.diff(sy))
+        return np.concatenate(([0.0], np.cumsum(segmentos)))
+
+    @property
+    def length(self):
+        return float(self.arc_length[-1])
+
+    def _uniform_table(self):
+        """Remuestrea la pista a distancias iguales para buscar posiciones en O(1)."""
+        if self._uniform is None:
+            distancias = np.linspace(0.0, self.length, UNIFORM_SAMPLES)
+            self._uniform = np.column_stack((np.interp(distancias, self.arc_length, self.xs),
+                                             np.interp(distancias, self.arc_length, self.ys)))
+        return self._uniform
+
+    def position_at(self, distance):
+        """Posición (x, y) a una distancia dada a lo largo de la pista.
+
+        Acepta un escalar o un arreglo de distancias; el costo no depende de
+        la cantidad de muestras de la pista.
+        """
+        tabla = self._uniform_table()
+        if self.length <= 0:
+            return tabla[0] if np.ndim(distance) == 0 else np.repeat(tabla[:1], np.size(distance), axis=0)
+        u = np.clip(np.asarray(distance, dtype=float) / self.length, 0.0, 1.0) * (UNIFORM_SAMPLES - 1)
+        i = np.minimum(u.astype(int), UNIFORM_SAMPLES - 2)
+        t = (u - i)[..., np.newaxis]
+        return tabla[i] * (1 - t) + tabla[i + 1] * t
+
+    @property
+    def points(self):
+        """Puntos de la pista como arreglo (N, 2)."""
+        return np.column_stack((self.xs, self.ys))
+
+    def __len__(self):
+        return len(self.xs)
+
+
+def compile_function(func_str, deadline=None):
+    """Convierte la cadena en una función vectorizada de NumPy.
+
+    La cadena pasa por la lista blanca y los límites de `expressions`; si no es
+    válida se usa la función por defecto. Si no se puede compilar con lambdify
+    se evalúa punto a punto con subs, hasta `deadline` en todos los llamados.
+    Retorna (expresión, evaluar, error), donde `error` explica el reemplazo.
+    """
+    # SymPy se importa aquí para no pagar su costo cuando la pista sale del caché
+    import sympy as sp
+    x = sp.Symbol('x')
+    error = None
+    try:
+        f_sym = parse_expression(func_str)
+    except ExpressionError as e:
+        error = str(e)
+        f_sym = parse_expression(FUNCION_POR_DEFECTO)
+    try:
+        f_np = sp.lambdify(x, f_sym, modules="numpy")
+    except Exception:
+        f_np = None
+
+    def evaluar(xs):
+        if f_np is not None:
+            try:
+                with np.errstate(all="ignore"):
+                    ys = np.asarray(f_np(xs))
+                if np.iscomplexobj(ys):
+                    # Valores complejos (log o sqrt de negativos): no son reales, cuentan como no finitos
+                    ys = np.where(ys.imag == 0, ys.real, np.nan)
+                ys = ys.astype(float)
+                # Las expresiones constantes devuelven un escalar
+                return np.broadcast_to(ys, xs.shape).copy()
+            except Exception:
+                pass
+        return evaluate_pointwise(f_sym, x, xs, deadline)
+
+    return f_sym, evaluar, error
+
+
+def _adaptive_samples(evaluar, xmin, xmax, max_points):
+    """Muestrea más denso donde la curva se aleja de la recta entre muestras vecinas.
+
+    En cada ronda se evalúa el punto medio de cada intervalo y se inserta si su
+    distancia (en píxeles de pantalla) a la cuerda supera ADAPTIVE_TOLERANCE,
+    hasta un máximo de `max_points` muestras.
+    """
+    xs = np.linspace(xmin, xmax, min(ADAPTIVE_INITIAL, max_points))
+    ys = evaluar(xs)
+    finitos = ys[np.isfinite(ys)]
+    span_y = float(np.ptp(np.percentile(finitos, [1, 99]))) if finitos.size else 0.0
+    escala_x = (SCREEN_WIDTH - 2 * TRACK_MARGIN) / ((xmax - xmin) or 1.0)
+    escala_y = (ANIM_HEIGHT - 2 * TRACK_MARGIN) / (span_y or 1.0)
+
+    for _ in range(ADAPTIVE_MAX_DEPTH):
+        cupo = max_points - len(xs)
+        if cupo <= 0:
+            break
+        medios = (xs[:-1] + xs[1:]) / 2
+        ys_medios = evaluar(medios)
+        desvio = np.abs(ys_medios - (ys[:-1] + ys[1:]) / 2) * escala_y
+        # Los valores no finitos también se refinan para acotar bien las asíntotas,
+        # salvo los intervalos sin ningún extremo finito (la función no existe ahí)
+        refinar = ~(desvio <= ADAPTIVE_TOLERANCE)
+        refinar &= np.isfinite(ys[:-1]) | np.isfinite(ys[1:])
+        refinar &= np.diff(xs) * escala_x > ADAPTIVE_MIN_STEP_PX
+        indices = np.flatnonzero(refinar)
+        if len(indices) == 0:
+            break
+        if len(indices) > cupo:
+            prioridad = np.nan_to_num(desvio[indices], nan=np.inf)
+            indices = np.sort(indices[np.argsort(-prioridad)[:cupo]])
+        xs = np.insert(xs, indices + 1, medios[indices])
+        ys = np.insert(ys, indices + 1, ys_medios[indices])
+    return xs, ys
+
+
+def build_track(func_str, xmin, xmax, num_points, adaptive=False):
+    """Muestrea la función en llamados vectorizados.
+
+    Con `adaptive` las muestras se concentran donde la curvatura es alta y
+    `num_points` es el máximo; si no, son `num_points` muestras equiespaciadas.
+    Las muestras no finitas o desmedidas se corrigen; si la función no da
+    ninguna muestra utilizable se usa la función por defecto. El costo de la
+    interpretación y la evaluación queda en `track.report`.
+    """
+    def muestrear(evaluar):
+        # Los desbordes y divisiones por cero se corrigen en sanitize_samples, sin avisos
+        with np.errstate(all="ignore"):
+            referencia = None
+            if adaptive:
+                xs, ys = _adaptive_samples(evaluar, xmin, xmax, num_points)
+                referencia = evaluar(np.linspace(xmin, xmax, CLIP_REFERENCE_SAMPLES))
+            else:
+                xs = np.linspace(xmin, xmax, num_points)
+                ys = evaluar(xs)
+            ys, limpieza = sanitize_samples(xs, ys, referencia)
+        return xs, ys, limpieza
+
+    inicio = time.perf_counter()
+    # Un solo límite para todas las evaluaciones: el muestreo adaptativo llama a evaluar muchas veces
+    _, evaluar, error = compile_function(func_str, inicio + EVAL_TIME_LIMIT)
+    parse_ms = (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    try:
+        xs, ys, limpieza = muestrear(evaluar)
+    except ExpressionError as e:
+        error = str(e)
+        _, evaluar, _ = compile_function(FUNCION_POR_DEFECTO)
+        xs, ys, limpieza = muestrear(evaluar)
+    eval_ms = (time.perf_counter() - inicio) * 1000
+
+    track = Track(func_str, xmin, xmax, np.ascontiguousarray(xs), np.ascontiguousarray(ys), adaptive=adaptive)
+    track.report = {"parse_ms": parse_ms, "eval_ms": eval_ms, "fallback": error is not None,
+                    "error": error, "samples": len(xs), **limpieza}
+    return track
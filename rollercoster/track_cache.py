@@ -0,0 +1,132 @@
+# track_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from rollercoster.config import (CACHE_DIR, TRACK_CACHE_SIZE, TRACK_ADAPTIVE, SCREEN_WIDTH, ANIM_HEIGHT,
+                                 TRACK_MARGIN)
+from rollercoster.track import Track, build_track
+
+# Versión del formato en disco: se incrementa cuando cambia lo que build_track
+# guarda en una pista (muestreo, limpieza de valores, longitud de arco)
+CACHE_FORMAT = 2
+
+
+class TrackCache:
+    """Caché LRU de pistas compiladas con persistencia opcional en disco.
+
+    La clave es (func_str, xmin, xmax, num_points, adaptive). Cada pista se guarda en un
+    archivo .npz dentro de `directory` para que sobreviva entre ejecuciones; el
+    nombre incluye además CACHE_FORMAT y el área de dibujo, de la que dependen
+    la longitud de arco y la densidad del muestreo adaptativo.
+    """
+
+    def __init__(self, max_size=TRACK_CACHE_SIZE, directory=None):
+        self.max_size = max_size
+        self.directory = directory
+        self._tracks = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # La precarga en segundo plano comparte el caché con el bucle principal
+        self._lock = threading.RLock()
+
+    def get(self, func_str, xmin, xmax, num_points, adaptive=TRACK_ADAPTIVE):
+        """Retorna la pista pedida, compilándola solo si no está en caché."""
+        key = (func_str, float(xmin), float(xmax), int(num_points), bool(adaptive))
+        with self._lock:
+            track = self._tracks.get(key)
+            if track is not None:
+                self._tracks.move_to_end(key)
+                self.hits += 1
+                return track
+
+            track = self._load(key)
+            if track is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                track = build_track(*key)
+                if _fallback(track):
+                    # Es la pista por defecto: guardarla bajo func_str la serviría como si fuera la pedida
+                    return track
+                self._save(key, track)
+            self._remember(key, track)
+            return track
+
+    def peek(self, func_str, xmin, xmax, num_points, adaptive=TRACK_ADAPTIVE):
+        """Retorna la pista si ya está en memoria, sin compilarla ni leer el disco."""
+        key = (func_str, float(xmin), float(xmax), int(num_points), bool(adaptive))
+        with self._lock:
+            return self._tracks.get(key)
+
+    def put(self, track, num_points):
+        """Guarda en memoria una pista compilada en otro proceso (salvo la de respaldo)."""
+        if _fallback(track):
+            return
+        key = (track.func_str, float(track.xmin), float(track.xmax), int(num_points), track.adaptive)
+        with self._lock:
+            self._remember(key, track)
+
+    def stats(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits,
+                "misses": self.misses, "size": len(self._tracks)}
+
+    def clear(self):
+        with self._lock:
+            self._tracks.clear()
+
+    def _remember(self, key, track):
+        self._tracks[key] = track
+        self._tracks.move_to_end(key)
+        while len(self._tracks) > self.max_size:
+            self._tracks.popitem(last=False)
+
+    def _path(self, key):
+        clave = (CACHE_FORMAT, SCREEN_WIDTH, ANIM_HEIGHT, TRACK_MARGIN) + key
+        digest = hashlib.sha1(repr(clave).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"track-{digest}.npz")
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if str(data["func_str"]) != key[0]:
+                    return None
+                return Track(key[0], key[1], key[2], data["xs"], data["ys"],
+                             arc_length=data["arc_length"], adaptive=key[4])
+        except Exception:
+            # Archivo dañado o de otra versión: se recompila
+            return None
+
+    def _save(self, key, track):
+        if self.directory is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path + ".tmp.npz"
+            np.savez(tmp_path, func_str=np.array(key[0]), xs=track.xs,
+                     ys=track.ys, arc_length=track.arc_length)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+def _fallback(track):
+    return bool(track.report and track.report.get("fallback"))
+
+
+track_cache = TrackCache(directory=os.path.join(CACHE_DIR, "tracks"))
+
+
+def get_track(func_str, xmin, xmax, num_points, adaptive=TRACK_ADAPTIVE):
+    """Atajo al caché compartido del juego."""
+    return track_cache.get(func_str, xmin, xmax, num_points, adaptive)
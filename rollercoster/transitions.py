@@ -1,23 +1,87 @@
 # transitions.py
+import sys
 import pygame
-from rollercoster.config import SCREEN_WIDTH, SCREEN_HEIGHT
+
+from rollercoster import display
+
+# Duración de los fundidos en segundos
+FADE_DURATION = 0.25
+
+# Una sola superficie negra por tamaño de pantalla, reutilizada por todos los fundidos
+_overlays = {}
+
+def _overlay(size):
+    overlay = _overlays.get(size)
+    if overlay is None:
+        overlay = pygame.Surface(size).convert()
+        overlay.fill((0, 0, 0))
+        _overlays[size] = overlay
+    return overlay
+
+def darken(surface, alpha):
+    """Oscurece toda la superficie con negro semitransparente."""
+    if alpha <= 0:
+        return
+    overlay = _overlay(surface.get_size())
+    overlay.set_alpha(alpha)
+    surface.blit(overlay, (0, 0))
+
+
+class Fade:
+    """Fundido por tiempo que se avanza desde el bucle principal.
+
+    direction="out" va de transparente a negro y direction="in" de negro a
+    transparente. Cada cuadro se llama a update(dt) y luego a draw(surface)
+    sobre la escena ya dibujada.
+    """
+
+    def __init__(self, direction, duration=FADE_DURATION):
+        self.direction = direction
+        self.duration = duration
+        self.elapsed = 0.0
+
+    @property
+    def done(self):
+        return self.elapsed >= self.duration
+
+    @property
+    def alpha(self):
+        t = min(1.0, self.elapsed / self.duration) if self.duration > 0 else 1.0
+        return int(255 * t) if self.direction == "out" else int(255 * (1 - t))
+
+    def update(self, dt):
+        self.elapsed = min(self.duration, self.elapsed + dt)
+
+    def draw(self, surface):
+        darken(surface, self.alpha)
+
+
+def run_fade(surface, fade, background=None, on_frame=None, fps=60):
+    """Reproduce un fundido sobre una imagen fija sin congelar la ventana.
+
+    Procesa los eventos en cada cuadro (cerrar la ventana sale del juego) y
+    llama a `on_frame` para que el trabajo pendiente avance mientras tanto.
+    """
+    if background is None:
+        background = surface.copy()
+    clock = pygame.time.Clock()
+    clock.tick()
+    while not fade.done:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+        if on_frame is not None:
+            on_frame()
+        fade.update(clock.tick(fps) / 1000.0)
+        surface.blit(background, (0, 0))
+        fade.draw(surface)
+        display.flip()
 
 def fade_out(surface, speed=5):
     """Efecto fade out: de transparente a negro."""
-    fade_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    fade_surface.fill((0, 0, 0))
-    for alpha in range(0, 256, speed):
-        fade_surface.set_alpha(alpha)
-        surface.blit(fade_surface, (0, 0))
-        pygame.display.update()
-        pygame.time.delay(10)
+    run_fade(surface, Fade("out", duration=FADE_DURATION * 10 / speed))
 
 def fade_in(surface, speed=5):
     """Efecto fade in: de negro a transparente."""
-    fade_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    fade_surface.fill((0, 0, 0))
-    for alpha in range(255, -1, -speed):
-        fade_surface.set_alpha(alpha)
-        surface.blit(fade_surface, (0, 0))
-        pygame.display.update()
-        pygame.time.delay(10)
+    run_fade(surface, Fade("in", duration=FADE_DURATION * 10 / speed))
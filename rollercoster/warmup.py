@@ -0,0 +1,34 @@
+# warmup.py
+"""Precarga en segundo plano de las dependencias pesadas del juego.
+
+Mientras el menú espera al usuario, un hilo importa el módulo del juego,
+arranca el pool de procesos que compila pistas y le pide las de los
+niveles y lotes de preguntas generadas, para que al elegir uno no haya que
+esperar.
+"""
+import threading
+
+_thread = None
+
+
+def _warmup(niveles, num_points):
+    from rollercoster import workers
+    # Los procesos arrancan mientras este hilo importa el juego
+    workers.start()
+    from rollercoster import game  # noqa: F401  (importa numpy y el resto del juego)
+    from rollercoster.generator import generated_pool
+    for _, _, valores in niveles:
+        workers.prefetch(valores['func'], valores['xmin'], valores['xmax'], num_points)
+    # Las preguntas generadas se encolan después de las pistas, que se necesitan antes
+    for nivel in range(1, len(niveles) + 1):
+        generated_pool.prefetch(nivel)
+
+
+def start(niveles, num_points):
+    """Inicia la precarga una sola vez; las llamadas siguientes no hacen nada."""
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=_warmup, args=(niveles, num_points),
+                                   name="warmup", daemon=True)
+        _thread.start()
+    return _thread
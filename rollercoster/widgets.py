@@ -0,0 +1,73 @@
+# widgets.py
+import pygame
+
+from rollercoster import assets, display
+
+# Multiplicadores de color para los estados del botón
+TINTE_HOVER = (150, 150, 150, 255)
+TINTE_PRESSED = (110, 110, 110, 255)
+
+
+def _tenir(imagen, tinte):
+    imagen = imagen.copy()
+    imagen.fill(tinte, special_flags=pygame.BLEND_RGBA_MULT)
+    return imagen
+
+
+class Button:
+    """Botón con sus variantes normal/hover/pressed calculadas al cargarlo.
+
+    `hit_rect` es el área de clic en píxeles de diseño (se lleva a la
+    resolución interna) y `rect` la posición de la imagen recortada;
+    cambiar de estado solo cambia qué superficie se dibuja, sin copiar nada.
+    """
+
+    def __init__(self, image_name, hit_rect, action=None):
+        image, self.rect = assets.load_sprite(image_name)
+        self.hit_rect = display.scale_rect(hit_rect)
+        self.action = action
+        self.variants = {
+            "normal": image,
+            "hover": _tenir(image, TINTE_HOVER),
+            "pressed": _tenir(image, TINTE_PRESSED),
+        }
+        self.state = "normal"
+
+    @property
+    def dirty_rect(self):
+        """Zona a actualizar cuando cambia el estado del botón."""
+        return self.rect.union(self.hit_rect)
+
+    def draw(self, surface):
+        return surface.blit(self.variants[self.state], self.rect)
+
+
+class ButtonGroup:
+    """Conjunto de botones con detección de clic sobre una tabla de rectángulos."""
+
+    def __init__(self, buttons):
+        self.buttons = list(buttons)
+        self._hit_rects = [button.hit_rect for button in self.buttons]
+
+    def hit_test(self, pos):
+        """Retorna el botón bajo `pos`, o None."""
+        index = pygame.Rect(pos, (1, 1)).collidelist(self._hit_rects)
+        return self.buttons[index] if index != -1 else None
+
+    def update(self, pos, pressed=False):
+        """Actualiza el estado de cada botón y retorna los que cambiaron."""
+        hovered = self.hit_test(pos)
+        changed = []
+        for button in self.buttons:
+            if button is hovered:
+                state = "pressed" if pressed else "hover"
+            else:
+                state = "normal"
+            if state != button.state:
+                button.state = state
+                changed.append(button)
+        return changed
+
+    def draw(self, surface):
+        for button in self.buttons:
+            button.draw(surface)
@@ -0,0 +1,115 @@
+# workers.py
+"""Preparación de pistas (y otras tareas con SymPy) en un pool de procesos.
+
+Compilar una pista (SymPy + muestreo) puede tardar, y una expresión
+patológica podría no terminar nunca; por eso se hace en procesos aparte.
+El bucle de la interfaz solo espera el resultado si todavía no está listo, y
+si se pasa del tiempo límite se descarta el pool y se usa la pista por defecto.
+"""
+import multiprocessing
+import threading
+import time
+
+from rollercoster.config import TRACK_POINTS, TRACK_ADAPTIVE, TRACK_WORKERS, TRACK_TIMEOUT
+from rollercoster.track import FUNCION_POR_DEFECTO
+from rollercoster.track_cache import track_cache
+
+_pool = None
+_requests = {}
+# La precarga del menú y el bucle principal piden pistas desde hilos distintos
+_lock = threading.RLock()
+
+
+def _compilar(func_str, xmin, xmax, num_points, adaptive):
+    """Se ejecuta en el proceso trabajador: usa su propio caché (incluido el de disco)."""
+    return track_cache.get(func_str, xmin, xmax, num_points, adaptive)
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            # "spawn" evita heredar el estado de SDL y de los hilos del proceso principal
+            _pool = multiprocessing.get_context("spawn").Pool(processes=TRACK_WORKERS)
+        return _pool
+
+
+def start():
+    """Arranca el pool por adelantado para no pagar su creación al elegir un nivel."""
+    _get_pool()
+
+
+def shutdown():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.terminate()
+            _pool = None
+        _requests.clear()
+
+
+class TrackRequest:
+    """Pista pedida al pool; `track` queda disponible cuando ready() es True."""
+
+    def __init__(self, key, track=None, result=None):
+        self.key = key
+        self.track = track
+        self.result = result
+
+    def ready(self):
+        return self.track is not None or self.result.ready()
+
+    def get(self):
+        if self.track is None:
+            self.track = self.result.get()
+            track_cache.put(self.track, self.key[3])
+            # Desde ahora la pista sale del caché: el pedido ya no hace falta
+            with _lock:
+                if _requests.get(self.key) is self:
+                    del _requests[self.key]
+        return self.track
+
+
+def submit(fn, *args):
+    """Encola otra tarea pesada en el mismo pool (por ejemplo, generar preguntas)."""
+    return _get_pool().apply_async(fn, args)
+
+
+def prefetch(func_str, xmin, xmax, num_points=TRACK_POINTS, adaptive=TRACK_ADAPTIVE):
+    """Pide la pista sin bloquear; si ya se pidió o está en memoria la reutiliza."""
+    key = (func_str, float(xmin), float(xmax), int(num_points), bool(adaptive))
+    track = track_cache.peek(*key)
+    if track is not None:
+        return TrackRequest(key, track=track)
+    with _lock:
+        request = _requests.get(key)
+        if request is None:
+            request = TrackRequest(key, result=_get_pool().apply_async(_compilar, key))
+            _requests[key] = request
+        return request
+
+
+def wait(request, timeout=TRACK_TIMEOUT, on_frame=None):
+    """Espera la pista llamando a `on_frame` mientras tanto para no congelar la ventana.
+
+    Si la compilación falla o supera `timeout` segundos se reinicia el pool y
+    se retorna la pista de la función por defecto.
+    """
+    limit = time.perf_counter() + timeout
+    while not request.ready():
+        if time.perf_counter() > limit:
+            shutdown()
+            return _por_defecto(request.key)
+        if on_frame is not None:
+            on_frame()
+        time.sleep(0.005)
+    try:
+        return request.get()
+    except Exception:
+        with _lock:
+            _requests.pop(request.key, None)
+        return _por_defecto(request.key)
+
+
+def _por_defecto(key):
+    return track_cache.get(FUNCION_POR_DEFECTO, key[1], key[2], key[3], key[4])